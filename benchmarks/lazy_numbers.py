@@ -0,0 +1,47 @@
+# Parse time of number-heavy documents with and without lazy_numbers, on the
+# pure engine (the stdlib one takes no options).
+#
+#   python -m benchmarks.lazy_numbers [rows]
+import random
+import sys
+import time
+from typing import Any
+
+from parse_json import ParseJson
+
+
+def document(rows: int) -> str:
+    generator = random.Random(0)
+    return "[%s]" % ", ".join(
+        "[%s]"
+        % ", ".join(
+            [str(generator.randint(-(10**6), 10**6)) for _ in range(20)]
+            + [repr(round(generator.random() * 100, 6)) for _ in range(10)]
+        )
+        for _ in range(rows)
+    )
+
+
+def measure(string: str, **options: Any) -> float:
+    parser = ParseJson("pure")
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        parser.parse(string, **options)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    string = document(rows)
+
+    eager = measure(string)
+    lazy = measure(string, lazy_numbers=True)
+    print(f"{rows * 30:,} numbers, {len(string):,} characters")
+    print(f"{'eager':>6}: {eager:.3f} s")
+    print(f"{'lazy':>6}: {lazy:.3f} s ({eager / lazy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Throughput of ParseJson.parse_many per engine and worker count.
+#
+#   python -m benchmarks.parse_many [documents]
+#
+# With the GIL only the process pool can use more than one core. Whether the
+# thread pool does on a free-threaded build (python3.13t) is not verified;
+# run this there to find out.
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from parse_json import ParseJson
+
+
+def payloads(count: int) -> list[str]:
+    return [
+        '{"id": %d, "event": "push", "ref": "refs/heads/main", "size": %d.5, '
+        '"commits": [{"id": "c%d", "added": ["a.py", "b.py"]}]}' % (i, i, i)
+        for i in range(count)
+    ]
+
+
+def measure(strings: list[str], executor: Executor | None, engine: str) -> float:
+    start = time.perf_counter()
+    ParseJson(engine).parse_many(strings, executor=executor)
+    return len(strings) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    strings = payloads(count)
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+    print(f"python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    for engine in ("pure", "auto"):
+        rate = measure(strings, None, engine)
+        print(f"{engine:>5} {'serial':>8} {1:>3} workers: {rate:>12,.0f} docs/s")
+
+        for name, pool in (
+            ("threads", ThreadPoolExecutor),
+            ("process", ProcessPoolExecutor),
+        ):
+            workers = 1
+            while workers <= (os.cpu_count() or 1):
+                with pool(max_workers=workers) as executor:
+                    rate = measure(strings, executor, engine)
+                print(
+                    f"{engine:>5} {name:>8} {workers:>3} workers: {rate:>12,.0f} docs/s"
+                )
+                workers *= 2
+
+
+if __name__ == "__main__":
+    main()
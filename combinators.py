@@ -0,0 +1,1187 @@
+import re
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+result_type = str | float | int | list[Any] | dict[Any, Any] | tuple[str, Any] | None
+
+
+def result_from_tuple(
+    success, parsed: result_type = None, remainder: str | None = None
+):
+    return Result(success=success, parsed=parsed, remainder=remainder)
+
+
+@dataclass
+class Result:
+    success: bool
+    parsed: result_type
+    remainder: str | None
+
+    def __iter__(self):
+        return iter((self.success, self.parsed, self.remainder))
+
+
+class Parser(Protocol):
+    def parse(self, string: str) -> Result:
+        ...
+
+
+class ParseError(Exception):
+    def __init__(self, message: str, pos: int = -1) -> None:
+        super().__init__(message)
+        self.pos = pos
+
+
+class ParseState:
+    __slots__ = ("memo", "memo_size", "depth", "count", "bound")
+
+    def __init__(self, memo_size: int | None = None, bound: int | None = None) -> None:
+        self.memo: dict[tuple[int, int], Any] | None = {} if memo_size else None
+        self.memo_size = memo_size or 0
+        self.depth = 0
+        self.count = 0
+        # the offset no `Bounded` parser may start after
+        self.bound = sys.maxsize if bound is None else bound
+
+
+Match = tuple[Any, int] | None
+Step = Callable[[str, int, ParseState], Match]
+
+_MISSING = object()
+
+
+class Combinator(ABC):
+    # Set of characters the parser can start with, or None when unknown.
+    # A known set means the parser never succeeds (nor raises) on any other
+    # character, which lets `Choice` dispatch on the next character.
+    def first(self) -> frozenset[str] | None:
+        return None
+
+    def map(self, fn: Callable[[Any], Any]) -> "Combinator":
+        return Map(self, fn)
+
+    def fuse(self, fuser: "_Fuser") -> "Combinator":
+        return self
+
+    @abstractmethod
+    def build(self, builder: "_Builder") -> Step:
+        ...
+
+
+class Literal(Combinator):
+    def __init__(self, text: str) -> None:
+        if not text:
+            raise ValueError("Literal cannot be empty")
+        self.text = text
+
+    def first(self) -> frozenset[str] | None:
+        return frozenset(self.text[0])
+
+    def build(self, builder: "_Builder") -> Step:
+        literal = self.text
+        size = len(literal)
+
+        if size == 1:
+
+            def step_char(text: str, pos: int, state: ParseState) -> Match:
+                if text[pos : pos + 1] == literal:
+                    return literal, pos + 1
+                return None
+
+            return step_char
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            if text.startswith(literal, pos):
+                return literal, pos + size
+            return None
+
+        return step
+
+
+class Regex(Combinator):
+    def __init__(self, pattern: str, group: int = 0, first: str | None = None):
+        self.pattern = pattern
+        self.compiled = re.compile(pattern)
+        self.group = group
+        self.first_chars = frozenset(first) if first is not None else None
+
+    def first(self) -> frozenset[str] | None:
+        return self.first_chars
+
+    def build(self, builder: "_Builder") -> Step:
+        match = self.compiled.match
+        group = self.group
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = match(text, pos)
+            if found is None:
+                return None
+            return found.group(group), found.end()
+
+        return step
+
+
+class Sequence(Combinator):
+    def __init__(self, parsers: tuple[Combinator, ...], pick: int | None = None):
+        self.parsers = parsers
+        self.pick = pick
+
+    def first(self) -> frozenset[str] | None:
+        return self.parsers[0].first()
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        parsers = [fuser.fuse(parser) for parser in self.parsers]
+        pick = self.pick
+
+        # the common "skip this, keep that, skip this" shape becomes two
+        # regex matches around a single child call
+        if (
+            pick is not None
+            and not _skippable(parsers[pick])
+            and all(
+                _skippable(parser)
+                for index, parser in enumerate(parsers)
+                if index != pick
+            )
+        ):
+            return _Around(parsers[:pick], parsers[pick], parsers[pick + 1 :])
+
+        # adjacent literals and regexes are matched by one regex; atomic
+        # groups keep the PEG semantics of not backtracking into a part
+        groups: list[list[Combinator]] = []
+        for parser in parsers:
+            if _fusable(parser) and groups and _fusable(groups[-1][0]):
+                groups[-1].append(parser)
+            else:
+                groups.append([parser])
+
+        if all(len(group) == 1 for group in groups):
+            return Sequence(tuple(parsers), self.pick)
+
+        children: list[Combinator] = []
+        for group in groups:
+            children.append(_FusedRegex(group) if len(group) > 1 else group[0])
+
+        if len(children) == 1:
+            fused = children[0]
+            assert isinstance(fused, _FusedRegex)
+            fused.pick = self.pick
+            return fused
+
+        return _SpreadSequence(tuple(children), self.pick)
+
+    def build(self, builder: "_Builder") -> Step:
+        # the skips around a "skip, keep, skip" child are matched here rather
+        # than in a step of its own, which saves a frame when it recurses
+        steps = tuple(_inlined(parser, builder) for parser in self.parsers)
+        pick = self.pick
+
+        if pick is not None:
+
+            def step_pick(text: str, pos: int, state: ParseState) -> Match:
+                picked = None
+                for index, (before, child, after) in enumerate(steps):
+                    if before is not None:
+                        skipped = before(text, pos)
+                        if skipped is None:
+                            return None
+                        pos = skipped.end()
+                    found = child(text, pos, state)
+                    if found is None:
+                        return None
+                    pos = found[1]
+                    if after is not None:
+                        skipped = after(text, pos)
+                        if skipped is None:
+                            return None
+                        pos = skipped.end()
+                    if index == pick:
+                        picked = found[0]
+                return picked, pos
+
+            return step_pick
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            values = []
+            for before, child, after in steps:
+                if before is not None:
+                    skipped = before(text, pos)
+                    if skipped is None:
+                        return None
+                    pos = skipped.end()
+                found = child(text, pos, state)
+                if found is None:
+                    return None
+                pos = found[1]
+                if after is not None:
+                    skipped = after(text, pos)
+                    if skipped is None:
+                        return None
+                    pos = skipped.end()
+                values.append(found[0])
+            return tuple(values), pos
+
+        return step
+
+
+class _SpreadSequence(Sequence):
+    # a sequence whose fused children return several values at once
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return self
+
+    def build(self, builder: "_Builder") -> Step:
+        steps = tuple(
+            (builder.step(parser), isinstance(parser, _FusedRegex))
+            for parser in self.parsers
+        )
+        pick = self.pick
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            values: list[Any] = []
+            for child, spread in steps:
+                found = child(text, pos, state)
+                if found is None:
+                    return None
+                if spread:
+                    values.extend(found[0])
+                else:
+                    values.append(found[0])
+                pos = found[1]
+            if pick is not None:
+                return values[pick], pos
+            return tuple(values), pos
+
+        return step
+
+
+class _Around(Combinator):
+    def __init__(
+        self,
+        before: list[Combinator],
+        parser: Combinator,
+        after: list[Combinator],
+    ) -> None:
+        self.before = _skip_pattern(before)
+        self.parser = parser
+        self.after = _skip_pattern(after)
+        self.first_chars = before[0].first() if before else parser.first()
+
+    def first(self) -> frozenset[str] | None:
+        return self.first_chars
+
+    def build(self, builder: "_Builder") -> Step:
+        before = self.before.match if self.before else None
+        after = self.after.match if self.after else None
+
+        dispatch = None
+        if isinstance(self.parser, Choice):
+            dispatch = self.parser.dispatch(builder)
+        if after is None and dispatch is not None:
+            assert before is not None
+            table, default = dispatch
+
+            # the choice is made here, one frame less for each value
+            def step_dispatch(text: str, pos: int, state: ParseState) -> Match:
+                skipped = before(text, pos)
+                if skipped is None:
+                    return None
+                pos = skipped.end()
+                for child in table.get(text[pos : pos + 1], default):
+                    found = child(text, pos, state)
+                    if found is not None:
+                        return found
+                return None
+
+            return step_dispatch
+
+        child = builder.step(self.parser)
+        if after is None:
+            assert before is not None
+
+            def step_before(text: str, pos: int, state: ParseState) -> Match:
+                skipped = before(text, pos)
+                if skipped is None:
+                    return None
+                return child(text, skipped.end(), state)
+
+            return step_before
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            if before is not None:
+                skipped = before(text, pos)
+                if skipped is None:
+                    return None
+                pos = skipped.end()
+            found = child(text, pos, state)
+            if found is None:
+                return None
+            skipped = after(text, found[1])
+            if skipped is None:
+                return None
+            return found[0], skipped.end()
+
+        return step
+
+
+class _FusedRegex(Combinator):
+    def __init__(self, parts: list[Combinator]) -> None:
+        pattern = []
+        self.groups: list[int] = []
+        index = 1
+        for part in parts:
+            part_pattern, part_group = _regex_of(part)
+            pattern.append(f"((?>{part_pattern}))")
+            self.groups.append(index + part_group)
+            index += 1 + re.compile(part_pattern).groups
+        self.compiled = re.compile("".join(pattern))
+        self.first_chars = parts[0].first()
+        self.pick: int | None = None
+
+    def first(self) -> frozenset[str] | None:
+        return self.first_chars
+
+    def build(self, builder: "_Builder") -> Step:
+        match = self.compiled.match
+        groups = self.groups
+
+        if self.pick is not None:
+            group = groups[self.pick]
+
+            def step_pick(text: str, pos: int, state: ParseState) -> Match:
+                found = match(text, pos)
+                if found is None:
+                    return None
+                return found.group(group), found.end()
+
+            return step_pick
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = match(text, pos)
+            if found is None:
+                return None
+            return found.group(*groups), found.end()
+
+        return step
+
+
+class Choice(Combinator):
+    def __init__(self, parsers: tuple[Combinator, ...]) -> None:
+        self.parsers = parsers
+
+    def first(self) -> frozenset[str] | None:
+        chars: frozenset[str] = frozenset()
+        for parser in self.parsers:
+            parser_first = parser.first()
+            if parser_first is None:
+                return None
+            chars |= parser_first
+        return chars
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        parsers: list[Combinator] = []
+        for parser in self.parsers:
+            parser = fuser.fuse(parser)
+            if isinstance(parser, Choice):
+                parsers.extend(parser.parsers)
+            else:
+                parsers.append(parser)
+
+        # ordered alternation of plain literals is a single regex match
+        merged: list[Combinator] = []
+        for parser in parsers:
+            if (
+                isinstance(parser, Literal)
+                and merged
+                and isinstance(merged[-1], (Literal, _LiteralSet))
+            ):
+                previous = merged.pop()
+                if isinstance(previous, _LiteralSet):
+                    texts = previous.texts
+                else:
+                    assert isinstance(previous, Literal)
+                    texts = [previous.text]
+                merged.append(_LiteralSet([*texts, parser.text]))
+            else:
+                merged.append(parser)
+
+        if len(merged) == 1:
+            return merged[0]
+        return Choice(tuple(merged))
+
+    def dispatch(
+        self, builder: "_Builder"
+    ) -> tuple[dict[str, tuple[Step, ...]], tuple[Step, ...]] | None:
+        # the alternatives to try for each first character and for any other
+        # one, or None when no alternative knows its first characters
+        steps = tuple(builder.step(parser) for parser in self.parsers)
+        firsts = [parser.first() for parser in self.parsers]
+
+        if all(chars is None for chars in firsts):
+            return None
+
+        default = tuple(child for child, chars in zip(steps, firsts) if chars is None)
+        table: dict[str, tuple[Step, ...]] = {}
+        for chars in firsts:
+            for char in chars or ():
+                table[char] = tuple(
+                    child
+                    for child, child_chars in zip(steps, firsts)
+                    if child_chars is None or char in child_chars
+                )
+        return table, default
+
+    def build(self, builder: "_Builder") -> Step:
+        dispatch = self.dispatch(builder)
+
+        if dispatch is None:
+            steps = tuple(builder.step(parser) for parser in self.parsers)
+
+            def step(text: str, pos: int, state: ParseState) -> Match:
+                for child in steps:
+                    found = child(text, pos, state)
+                    if found is not None:
+                        return found
+                return None
+
+            return step
+
+        table, default = dispatch
+
+        def step_dispatch(text: str, pos: int, state: ParseState) -> Match:
+            for child in table.get(text[pos : pos + 1], default):
+                found = child(text, pos, state)
+                if found is not None:
+                    return found
+            return None
+
+        return step_dispatch
+
+
+class _LiteralSet(Regex):
+    def __init__(self, texts: list[str]) -> None:
+        super().__init__("|".join(re.escape(text) for text in texts))
+        self.texts = texts
+        self.first_chars = frozenset(text[0] for text in texts)
+
+
+class Many(Combinator):
+    def __init__(self, parser: Combinator, min_count: int = 0) -> None:
+        self.parser = parser
+        self.min_count = min_count
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first() if self.min_count else None
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Many(fuser.fuse(self.parser), self.min_count)
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        min_count = self.min_count
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            values = []
+            while True:
+                found = child(text, pos, state)
+                # a parser that consumes nothing would loop forever
+                if found is None or found[1] == pos:
+                    break
+                values.append(found[0])
+                pos = found[1]
+            if len(values) < min_count:
+                return None
+            return values, pos
+
+        return step
+
+
+class SepBy(Combinator):
+    def __init__(
+        self,
+        parser: Combinator,
+        separator: Combinator,
+        min_count: int = 0,
+        max_count: int | None = None,
+    ) -> None:
+        self.parser = parser
+        self.separator = separator
+        self.min_count = min_count
+        self.max_count = max_count
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first() if self.min_count else None
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return SepBy(
+            fuser.fuse(self.parser),
+            fuser.fuse(self.separator),
+            self.min_count,
+            self.max_count,
+        )
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        min_count = self.min_count
+        max_count = sys.maxsize if self.max_count is None else self.max_count
+
+        if _skippable(self.separator):
+            skip = _skip_pattern([self.separator])
+            assert skip is not None
+            skip_separator = skip.match
+
+            def step_skip(text: str, pos: int, state: ParseState) -> Match:
+                found = child(text, pos, state)
+                if found is None:
+                    return ([], pos) if min_count == 0 else None
+                values = [found[0]]
+                pos = found[1]
+                while True:
+                    skipped = skip_separator(text, pos)
+                    if skipped is None:
+                        break
+                    found = child(text, skipped.end(), state)
+                    if found is None:
+                        break
+                    if len(values) == max_count:
+                        raise ParseError("Too many items", skipped.end())
+                    values.append(found[0])
+                    pos = found[1]
+                if len(values) < min_count:
+                    return None
+                return values, pos
+
+            return step_skip
+
+        separator = builder.step(self.separator)
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = child(text, pos, state)
+            if found is None:
+                return ([], pos) if min_count == 0 else None
+            values = [found[0]]
+            pos = found[1]
+            while True:
+                found = separator(text, pos, state)
+                if found is None:
+                    break
+                item_pos = found[1]
+                found = child(text, item_pos, state)
+                if found is None:
+                    break
+                if len(values) == max_count:
+                    raise ParseError("Too many items", item_pos)
+                values.append(found[0])
+                pos = found[1]
+            if len(values) < min_count:
+                return None
+            return values, pos
+
+        return step
+
+
+class Bracketed(Combinator):
+    # Items apart by separators between an opening and a closing delimiter,
+    # as a list passed to `fn`. Once the opening delimiter matched, anything
+    # but items and the closing delimiter raises `message` at its end. A
+    # container is a single step, so it costs one frame per level of nesting
+    def __init__(
+        self,
+        opening: Combinator,
+        parser: Combinator,
+        separator: Combinator,
+        closing: Combinator,
+        message: str,
+        max_count: int | None = None,
+        fn: Callable[[Any], Any] | None = None,
+    ) -> None:
+        self.opening = opening
+        self.parser = parser
+        self.separator = separator
+        self.closing = closing
+        self.message = message
+        self.max_count = max_count
+        self.fn = fn
+
+    def first(self) -> frozenset[str] | None:
+        return self.opening.first()
+
+    def mapped(self, fn: Callable[[Any], Any]) -> "Bracketed":
+        if self.fn is not None:
+            inner, outer = self.fn, fn
+            fn = lambda value: outer(inner(value))
+        return Bracketed(
+            self.opening,
+            self.parser,
+            self.separator,
+            self.closing,
+            self.message,
+            self.max_count,
+            fn,
+        )
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Bracketed(
+            fuser.fuse(self.opening),
+            fuser.fuse(self.parser),
+            fuser.fuse(self.separator),
+            fuser.fuse(self.closing),
+            self.message,
+            self.max_count,
+            self.fn,
+        )
+
+    def expanded(self) -> Combinator:
+        # the same container from the general combinators
+        parser: Combinator = Sequence(
+            (
+                self.opening,
+                Expect(
+                    Sequence(
+                        (
+                            SepBy(self.parser, self.separator, 0, self.max_count),
+                            self.closing,
+                        ),
+                        pick=0,
+                    ),
+                    self.message,
+                ),
+            ),
+            pick=1,
+        )
+        return parser if self.fn is None else Map(parser, self.fn)
+
+    def build(self, builder: "_Builder") -> Step:
+        delimiters = [
+            _skip_pattern([parser])
+            for parser in (self.opening, self.separator, self.closing)
+            if _skippable(parser)
+        ]
+        if len(delimiters) < 3:
+            return builder.step(self.expanded())
+
+        opening, separator, closing = (
+            pattern.match for pattern in delimiters  # type: ignore[union-attr]
+        )
+        child = builder.step(self.parser)
+        message = self.message
+        max_count = sys.maxsize if self.max_count is None else self.max_count
+        fn = self.fn
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            skipped = opening(text, pos)
+            if skipped is None:
+                return None
+            start = end = skipped.end()
+
+            values = []
+            found = child(text, start, state)
+            if found is not None:
+                values.append(found[0])
+                end = found[1]
+                while True:
+                    skipped = separator(text, end)
+                    if skipped is None:
+                        break
+                    found = child(text, skipped.end(), state)
+                    if found is None:
+                        break
+                    if len(values) == max_count:
+                        raise ParseError("Too many items", skipped.end())
+                    values.append(found[0])
+                    end = found[1]
+
+            skipped = closing(text, end)
+            if skipped is None:
+                raise ParseError(message, start)
+            if fn is None:
+                return values, skipped.end()
+            try:
+                return fn(values), skipped.end()
+            except ParseError as error:
+                if error.pos < 0:
+                    error.pos = pos
+                raise
+
+        return step
+
+
+class Optional(Combinator):
+    def __init__(self, parser: Combinator, default: Any = None) -> None:
+        self.parser = parser
+        self.default = default
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Optional(fuser.fuse(self.parser), self.default)
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        default = self.default
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = child(text, pos, state)
+            if found is None:
+                return default, pos
+            return found
+
+        return step
+
+
+class Map(Combinator):
+    def __init__(self, parser: Combinator, fn: Callable[[Any], Any]) -> None:
+        self.parser = parser
+        self.fn = fn
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first()
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        parser = fuser.fuse(self.parser)
+        if isinstance(parser, Map):
+            inner, outer = parser.fn, self.fn
+            return Map(parser.parser, lambda value: outer(inner(value)))
+        if isinstance(parser, Bracketed):
+            return parser.mapped(self.fn)
+        return Map(parser, self.fn)
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        fn = self.fn
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = child(text, pos, state)
+            if found is None:
+                return None
+            try:
+                return fn(found[0]), found[1]
+            except ParseError as error:
+                # errors raised without a position point at the value
+                if error.pos < 0:
+                    error.pos = pos
+                raise
+
+        return step
+
+
+class Expect(Combinator):
+    def __init__(self, parser: Combinator, message: str) -> None:
+        self.parser = parser
+        self.message = message
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Expect(fuser.fuse(self.parser), self.message)
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        message = self.message
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = child(text, pos, state)
+            if found is None:
+                raise ParseError(message, pos)
+            return found
+
+        return step
+
+
+class Fail(Combinator):
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+    def build(self, builder: "_Builder") -> Step:
+        message = self.message
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            raise ParseError(message, pos)
+
+        return step
+
+
+class Nested(Combinator):
+    def __init__(self, parser: Combinator, max_depth: int) -> None:
+        self.parser = parser
+        self.max_depth = max_depth
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first()
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Nested(fuser.fuse(self.parser), self.max_depth)
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        max_depth = self.max_depth
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            # checked on entry, before the parser gets a chance to fail
+            depth = state.depth + 1
+            if depth > max_depth:
+                raise ParseError("Maximum nesting depth exceeded", pos)
+            # a ParseError ends the whole parse, so the depth is only
+            # restored on the paths that return
+            state.depth = depth
+            found = child(text, pos, state)
+            state.depth = depth - 1
+            return found
+
+        return step
+
+
+class Counted(Combinator):
+    def __init__(self, parser: Combinator, max_count: int) -> None:
+        self.parser = parser
+        self.max_count = max_count
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first()
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Counted(fuser.fuse(self.parser), self.max_count)
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        max_count = self.max_count
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = child(text, pos, state)
+            if found is not None:
+                state.count += 1
+                if state.count > max_count:
+                    raise ParseError("Too many values", pos)
+            return found
+
+        return step
+
+
+class Bounded(Combinator):
+    # raises `message` at the bound of the parse state when started past it,
+    # so a parse can give up long before reaching the end of the input
+    def __init__(self, parser: Combinator, message: str) -> None:
+        self.parser = parser
+        self.message = message
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first()
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Bounded(fuser.fuse(self.parser), self.message)
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        message = self.message
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            if pos > state.bound:
+                raise ParseError(message, state.bound)
+            return child(text, pos, state)
+
+        return step
+
+
+class Memo(Combinator):
+    def __init__(self, parser: Combinator) -> None:
+        self.parser = parser
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first()
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Memo(fuser.fuse(self.parser))
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+        if not builder.memo:
+            return child
+
+        key_id = id(self)
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            table = state.memo
+            if table is None:
+                return child(text, pos, state)
+
+            key = (key_id, pos)
+            found = table.get(key, _MISSING)
+            if found is not _MISSING:
+                return found  # type: ignore[return-value]
+
+            found = child(text, pos, state)
+            if len(table) >= state.memo_size:
+                # dicts keep insertion order, so this evicts the oldest entry
+                del table[next(iter(table))]
+            table[key] = found
+            return found
+
+        return step
+
+
+class Forward(Combinator):
+    def __init__(self) -> None:
+        self.parser: Combinator | None = None
+        self._computing_first = False
+
+    def define(self, parser: Combinator) -> None:
+        self.parser = parser
+
+    def first(self) -> frozenset[str] | None:
+        if self.parser is None or self._computing_first:
+            return None
+        self._computing_first = True
+        try:
+            return self.parser.first()
+        finally:
+            self._computing_first = False
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        if self.parser is None:
+            raise ValueError("Forward parser used before being defined")
+        fused = Forward()
+        fuser.seen[id(self)] = fused
+        fused.define(fuser.fuse(self.parser))
+        return fused
+
+    def build(self, builder: "_Builder") -> Step:
+        if self.parser is None:
+            raise ValueError("Forward parser used before being defined")
+
+        target: list[Step] = []
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            return target[0](text, pos, state)
+
+        builder.steps[id(self)] = step
+        target.append(builder.step(self.parser))
+        return step
+
+
+class Spanned(Combinator):
+    def __init__(self, parser: Combinator) -> None:
+        self.parser = parser
+
+    def first(self) -> frozenset[str] | None:
+        return self.parser.first()
+
+    def fuse(self, fuser: "_Fuser") -> Combinator:
+        return Spanned(fuser.fuse(self.parser))
+
+    def build(self, builder: "_Builder") -> Step:
+        child = builder.step(self.parser)
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            found = child(text, pos, state)
+            if found is None:
+                return None
+            return (found[0], pos, found[1]), found[1]
+
+        return step
+
+
+class Lift(Combinator):
+    # adapts a remainder-based `Parser` so it can be used inside a grammar
+    def __init__(self, parser: Parser) -> None:
+        self.parser = parser
+
+    def build(self, builder: "_Builder") -> Step:
+        parser = self.parser
+
+        def step(text: str, pos: int, state: ParseState) -> Match:
+            if pos >= len(text):
+                return None
+            success, parsed, remainder = parser.parse(text[pos:])
+            if not success:
+                return None
+            return parsed, len(text) - len(remainder or "")
+
+        return step
+
+
+def _fusable(parser: Combinator) -> bool:
+    if isinstance(parser, Literal):
+        return True
+    if isinstance(parser, Regex):
+        # numbered backreferences and named groups break once concatenated,
+        # and global flags are only allowed at the start of a pattern
+        return not parser.compiled.groupindex and not re.search(
+            r"\\\d|\(\?P=|^\(\?[aiLmsux]+\)", parser.pattern
+        )
+    return False
+
+
+def _skippable(parser: Combinator) -> bool:
+    # parsers whose value is thrown away can also be fused sequences
+    return isinstance(parser, _FusedRegex) or _fusable(parser)
+
+
+def _regex_of(parser: Combinator) -> tuple[str, int]:
+    if isinstance(parser, Literal):
+        return re.escape(parser.text), 0
+    if isinstance(parser, _FusedRegex):
+        return parser.compiled.pattern, 0
+    assert isinstance(parser, Regex)
+    return parser.pattern, parser.group
+
+
+def _skip_pattern(parsers: list[Combinator]) -> re.Pattern[str] | None:
+    if not parsers:
+        return None
+    return re.compile("".join(f"(?>{_regex_of(parser)[0]})" for parser in parsers))
+
+
+SkipMatch = Callable[[str, int], re.Match[str] | None]
+
+
+def _inlined(
+    parser: Combinator, builder: "_Builder"
+) -> tuple[SkipMatch | None, Step, SkipMatch | None]:
+    if not isinstance(parser, _Around):
+        return None, builder.step(parser), None
+    before = parser.before.match if parser.before else None
+    after = parser.after.match if parser.after else None
+    return before, builder.step(parser.parser), after
+
+
+class _Fuser:
+    def __init__(self) -> None:
+        self.seen: dict[int, Combinator] = {}
+
+    def fuse(self, parser: Combinator) -> Combinator:
+        key = id(parser)
+        if key not in self.seen:
+            self.seen[key] = parser.fuse(self)
+        return self.seen[key]
+
+
+class _Builder:
+    def __init__(self, memo: bool) -> None:
+        self.memo = memo
+        self.steps: dict[int, Step] = {}
+        # steps are keyed by id, so parsers built on the fly are kept alive
+        self.parsers: list[Combinator] = []
+
+    def step(self, parser: Combinator) -> Step:
+        key = id(parser)
+        if key not in self.steps:
+            self.parsers.append(parser)
+            self.steps[key] = parser.build(self)
+        return self.steps[key]
+
+
+class CompiledParser:
+    def __init__(self, step: Step, memo_size: int | None = None) -> None:
+        self.step = step
+        self.memo_size = memo_size
+
+    # `bound` is the offset past which `Bounded` parsers raise
+    def match(self, text: str, pos: int = 0, bound: int | None = None) -> Match:
+        return self.step(text, pos, ParseState(self.memo_size, bound))
+
+    def __call__(self, text: str, pos: int = 0) -> tuple[Any, int]:
+        found = self.match(text, pos)
+        if found is None:
+            raise ParseError("Failed to parse", pos)
+        return found
+
+    def parse(self, string: str) -> Result:
+        if not string:
+            return result_from_tuple(False)
+
+        found = self.match(string)
+        if found is None:
+            return result_from_tuple(False)
+
+        parsed, end = found
+        return result_from_tuple(True, parsed, string[end:])
+
+
+def compile_parser(
+    parser: Combinator, memo_size: int | None = None, fuse: bool = True
+) -> CompiledParser:
+    if fuse:
+        parser = _Fuser().fuse(parser)
+    step = _Builder(memo=bool(memo_size)).step(parser)
+    return CompiledParser(step, memo_size)
+
+
+def literal(text: str) -> Combinator:
+    return Literal(text)
+
+
+def regex(pattern: str, group: int = 0, first: str | None = None) -> Combinator:
+    return Regex(pattern, group, first)
+
+
+def sequence(*parsers: Combinator, pick: int | None = None) -> Combinator:
+    return Sequence(parsers, pick)
+
+
+def choice(*parsers: Combinator) -> Combinator:
+    return Choice(parsers)
+
+
+def many(parser: Combinator, min_count: int = 0) -> Combinator:
+    return Many(parser, min_count)
+
+
+def sep_by(
+    parser: Combinator,
+    separator: Combinator,
+    min_count: int = 0,
+    max_count: int | None = None,
+) -> Combinator:
+    return SepBy(parser, separator, min_count, max_count)
+
+
+def bracketed(
+    opening: Combinator,
+    parser: Combinator,
+    separator: Combinator,
+    closing: Combinator,
+    message: str,
+    max_count: int | None = None,
+) -> Combinator:
+    return Bracketed(opening, parser, separator, closing, message, max_count)
+
+
+def optional(parser: Combinator, default: Any = None) -> Combinator:
+    return Optional(parser, default)
+
+
+def map_result(parser: Combinator, fn: Callable[[Any], Any]) -> Combinator:
+    return Map(parser, fn)
+
+
+def expect(parser: Combinator, message: str) -> Combinator:
+    return Expect(parser, message)
+
+
+def fail(message: str) -> Combinator:
+    return Fail(message)
+
+
+def nested(parser: Combinator, max_depth: int) -> Combinator:
+    return Nested(parser, max_depth)
+
+
+def counted(parser: Combinator, max_count: int) -> Combinator:
+    return Counted(parser, max_count)
+
+
+def bounded(parser: Combinator, message: str) -> Combinator:
+    return Bounded(parser, message)
+
+
+def memo(parser: Combinator) -> Combinator:
+    return Memo(parser)
+
+
+def forward() -> Forward:
+    return Forward()
+
+
+def spanned(parser: Combinator) -> Combinator:
+    return Spanned(parser)
+
+
+def lift(parser: Parser) -> Combinator:
+    return Lift(parser)
@@ -0,0 +1,208 @@
+import io
+import re
+import sys
+from collections.abc import Iterator, Mapping
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, TextIO
+
+from parse_json import STRING_BODY_PATTERN, LazyNumber
+
+__all__ = ["JsonEncoder", "dump", "dumps"]
+
+RAW_STRING = re.compile(STRING_BODY_PATTERN)
+NEEDS_ESCAPE = re.compile(r'[\x00-\x1f"\\]')
+ESCAPES = {code: f"\\u{code:04x}" for code in range(0x20)}
+ESCAPES.update(
+    {
+        ord('"'): '\\"',
+        ord("\\"): "\\\\",
+        ord("\b"): "\\b",
+        ord("\f"): "\\f",
+        ord("\n"): "\\n",
+        ord("\r"): "\\r",
+        ord("\t"): "\\t",
+    }
+)
+
+# encoded keys are cached per encoder up to this many distinct keys
+MAX_CACHED_KEYS = 4096
+
+
+def raw_string(string: str) -> str:
+    # ParseJson keeps strings as they are written, escapes included, so they
+    # are written back unchanged; a string it could not have produced is
+    # rejected instead of being changed
+    if '"' in string and not RAW_STRING.fullmatch(string) or string.endswith("\\"):
+        raise ValueError(f"Cannot write {string!r} as a raw string, use escape=True")
+    return '"' + string + '"'
+
+
+def escaped_string(string: str) -> str:
+    if NEEDS_ESCAPE.search(string):
+        string = string.translate(ESCAPES)
+    return '"' + string + '"'
+
+
+def float_text(number: float) -> str:
+    # the parser reads no exponents, so they are written out in full
+    text = float.__repr__(number)
+    if not text[-1].isdigit():
+        raise ValueError(f"Cannot write {text} as JSON")
+    if "e" in text:
+        text = format(Decimal(text), "f")
+        if "." not in text:
+            text += ".0"
+    return text
+
+
+def decimal_text(number: Decimal) -> str:
+    if not number.is_finite():
+        raise ValueError(f"Cannot write {number} as JSON")
+    return format(number, "f")
+
+
+class JsonEncoder:
+    # Writes what ParseJson produces: dicts, lists, strings and numbers,
+    # including LazyNumber and Decimal. Strings are written raw unless
+    # `escape` is set, for strings that hold the text itself rather than its
+    # JSON spelling. With `stream_iterators` iterators and generators are
+    # written as lists as they are consumed
+    def __init__(
+        self,
+        escape: bool = False,
+        stream_iterators: bool = False,
+        buffer_size: int = 16384,
+    ) -> None:
+        self.encode_string = escaped_string if escape else raw_string
+        self.stream_iterators = stream_iterators
+        self.buffer_size = buffer_size
+        self.keys: dict[str, tuple[str, str]] = {}
+
+    def encode(self, value: Any) -> str:
+        pieces: list[str] = []
+        self.write_value(value, pieces, lambda: None, sys.maxsize)
+        return "".join(pieces)
+
+    def dump(
+        self, value: Any, sink: TextIO | BinaryIO, encoding: str = "utf-8"
+    ) -> None:
+        write: Callable[[str], Any]
+        if isinstance(sink, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(
+            sink, "mode", ""
+        ):
+            write = lambda text: sink.write(text.encode(encoding))  # type: ignore[arg-type]
+        else:
+            write = sink.write  # type: ignore[assignment]
+
+        # pieces are joined and written once `buffer_size` have piled up
+        pieces: list[str] = []
+
+        def flush() -> None:
+            write("".join(pieces))
+            pieces.clear()
+
+        self.write_value(value, pieces, flush, self.buffer_size)
+        flush()
+
+    def write_value(
+        self,
+        value: Any,
+        pieces: list[str],
+        flush: Callable[[], None],
+        limit: int,
+    ) -> None:
+        # flushes between items once `pieces` holds `limit` of them
+        append = pieces.append
+        encode_string = self.encode_string
+        keys = self.keys
+
+        def key_texts(key: Any) -> tuple[str, str]:
+            # the key as the first item of a dict and as a later one
+            if type(key) is not str:
+                raise TypeError(f"Keys must be str, not {type(key).__name__}")
+            text = encode_string(key) + ":"
+            texts = (text, "," + text)
+            if len(keys) < MAX_CACHED_KEYS:
+                keys[key] = texts
+            return texts
+
+        def write(value: Any) -> None:
+            kind = type(value)
+            if kind is str:
+                append(encode_string(value))
+            elif kind is dict or kind is not list and isinstance(value, Mapping):
+                append("{")
+                later = 0
+                for key, item in value.items():
+                    append((keys.get(key) or key_texts(key))[later])
+                    later = 1
+                    kind = type(item)
+                    if kind is str:
+                        append(encode_string(item))
+                    elif kind is int:
+                        append(int.__repr__(item))
+                    else:
+                        write(item)
+                    if len(pieces) >= limit:
+                        flush()
+                append("}")
+            elif kind is int:
+                append(int.__repr__(value))
+            elif kind is float:
+                append(float_text(value))
+            elif (
+                kind is list
+                or isinstance(value, (list, tuple))
+                or self.stream_iterators
+                and isinstance(value, Iterator)
+            ):
+                append("[")
+                separator = ""
+                for item in value:
+                    if separator:
+                        append(separator)
+                    separator = ","
+                    kind = type(item)
+                    if kind is str:
+                        append(encode_string(item))
+                    elif kind is int:
+                        append(int.__repr__(item))
+                    else:
+                        write(item)
+                    if len(pieces) >= limit:
+                        flush()
+                append("]")
+            elif kind is LazyNumber:
+                append(value.text)
+            elif kind is Decimal:
+                append(decimal_text(value))
+            elif isinstance(value, str):
+                append(encode_string(value))
+            elif isinstance(value, int) and not isinstance(value, bool):
+                append(int.__repr__(value))
+            elif isinstance(value, float):
+                append(float_text(value))
+            else:
+                raise TypeError(f"Cannot write a {kind.__name__} as JSON")
+
+        write(value)
+
+
+@lru_cache(maxsize=32)
+def encoder(
+    escape: bool = False, stream_iterators: bool = False, buffer_size: int = 16384
+) -> JsonEncoder:
+    return JsonEncoder(escape, stream_iterators, buffer_size)
+
+
+# options are the arguments of JsonEncoder; encoders, and with them the cache
+# of encoded keys, are shared between calls with the same options
+def dumps(value: Any, **options: Any) -> str:
+    return encoder(**options).encode(value)
+
+
+def dump(
+    value: Any, sink: TextIO | BinaryIO, encoding: str = "utf-8", **options: Any
+) -> None:
+    encoder(**options).dump(value, sink, encoding)
@@ -0,0 +1,209 @@
+import re
+from typing import Callable, TextIO
+
+from combinators import ParseError
+from parse_json import STRING_BODY_PATTERN
+
+# leading whitespace, then a structural token, a run of number characters,
+# anything else or the end of the chunk
+TOKEN_PATTERN = re.compile(r'(\s*+)(?:([\[\]{},:"-])|([\d.]++)|(.)|\Z)', re.S)
+STRING_BODY = re.compile(STRING_BODY_PATTERN)
+
+# for minifying whole runs of text that hold only complete strings
+COMPLETE_RUN = re.compile(f'(?:"{STRING_BODY_PATTERN}"|[^"])*+')
+STRING = re.compile(f'("{STRING_BODY_PATTERN}")')
+UNEXPECTED = re.compile(r'[^\s\[\]{},:"\d.-]|[\d.]\s+[\d.]')
+BRACKET = re.compile(r"[\[\]{}]")
+
+CLOSING = {"[": "]", "{": "}"}
+
+
+class Formatter:
+    # Copies strings and numbers unchanged and rewrites the whitespace around
+    # structural tokens, one chunk at a time. Only brackets and quotes are
+    # checked; a string or number may span any number of chunks. With no
+    # indent the output is minified
+    def __init__(self, write: Callable[[str], object], indent: str | None) -> None:
+        self.write = write
+        self.indent = indent
+        self.closing: list[str] = []
+        self.offset = 0
+        self.in_string = False
+        # the string read so far ends with a backslash
+        self.escaped = False
+        # the last token was a run of digits and dots
+        self.in_number = False
+        self.spaced = False
+        self.opened = False
+        self.started = False
+
+    def feed(self, chunk: str) -> None:
+        out: list[str] = []
+        end = len(chunk)
+        pos = self.read_string(chunk, 0, end, out) if self.in_string else 0
+
+        if self.indent is None and pos < end:
+            cut = COMPLETE_RUN.match(chunk, pos).end()  # type: ignore[union-attr]
+            if self.minify(chunk[pos:cut], out):
+                pos = cut
+
+        self.scan(chunk, pos, end, out)
+        self.offset += end
+        self.write("".join(out))
+
+    def read_string(self, chunk: str, pos: int, end: int, out: list[str]) -> int:
+        start = pos + 1 if self.escaped and chunk[pos] == '"' else pos
+        body_end = STRING_BODY.match(chunk, start, end).end()  # type: ignore[union-attr]
+        out.append(chunk[pos:body_end])
+        if body_end == end:
+            self.escaped = chunk[end - 1] == "\\"
+            return end
+
+        out.append('"')
+        self.in_string = False
+        return body_end + 1
+
+    def minify(self, run: str, out: list[str]) -> bool:
+        # Minifies a run of complete strings and other tokens with a few
+        # passes over the whole run. Returns False, changing nothing, when the
+        # run needs checking token by token
+        parts = STRING.split(run)
+        stripped = '""'.join(parts[0::2])
+        if UNEXPECTED.search(stripped):
+            return False
+
+        head = stripped.lstrip()
+        tail = stripped.rstrip()
+        if self.in_number and continues_number(head):
+            if self.spaced or len(head) < len(stripped):
+                return False
+
+        closing = self.closing.copy()
+        top_level = 0
+        for found in BRACKET.finditer(stripped):
+            bracket = found.group()
+            if not closing and stripped[top_level : found.start()].strip():
+                return False
+            if bracket in CLOSING:
+                closing.append(CLOSING[bracket])
+            elif not closing or closing.pop() != bracket:
+                return False
+            top_level = found.end()
+        if not closing and stripped[top_level:].strip():
+            return False
+
+        # the text between strings is compacted in one go, split back up on a
+        # character that cannot occur outside of strings here
+        parts[0::2] = "".join("\0".join(parts[0::2]).split()).split("\0")
+        out.append("".join(parts))
+        self.closing = closing
+        if tail:
+            self.in_number = continues_number(tail[-1])
+            self.spaced = len(tail) < len(stripped)
+        else:
+            self.spaced = self.spaced or bool(stripped)
+        return True
+
+    def scan(self, chunk: str, pos: int, end: int, out: list[str]) -> None:
+        while pos < end:
+            if self.in_string:
+                pos = self.read_string(chunk, pos, end, out)
+                continue
+
+            found = TOKEN_PATTERN.match(chunk, pos, end)
+            pos = found.end()  # type: ignore[union-attr]
+            space, token, digits, other = found.groups()  # type: ignore[union-attr]
+            self.spaced = self.spaced or bool(space)
+
+            if digits:
+                if self.in_number and self.spaced:
+                    start = found.start(3)  # type: ignore[union-attr]
+                    raise ParseError("Unexpected number", self.offset + start)
+                if not self.in_number:
+                    self.start_value(out, found.start(3))  # type: ignore[union-attr]
+                out.append(digits)
+                self.in_number = True
+            elif token:
+                self.add_token(out, token, found.start(2))  # type: ignore[union-attr]
+            elif other:
+                start = found.start(4)  # type: ignore[union-attr]
+                raise ParseError("Unexpected character", self.offset + start)
+            else:
+                continue
+            self.spaced = False
+
+    def start_value(self, out: list[str], pos: int) -> None:
+        if not self.closing:
+            raise ParseError("Invalid JSON provided.", self.offset + pos)
+        if self.opened and self.indent is not None:
+            out.append("\n" + self.indent * len(self.closing))
+        self.opened = False
+
+    def add_token(self, out: list[str], token: str, pos: int) -> None:
+        # a minus sign starts a number, and whitespace after it is dropped
+        self.in_number = False
+
+        if token in CLOSING:
+            if self.closing:
+                self.start_value(out, pos)
+            elif self.started and self.indent is not None:
+                out.append("\n")
+            out.append(token)
+            self.closing.append(CLOSING[token])
+            self.opened = self.started = True
+        elif token == "]" or token == "}":
+            if not self.closing or self.closing[-1] != token:
+                raise ParseError("Parsing error. Mismatched bracket", self.offset + pos)
+            self.closing.pop()
+            if not self.opened and self.indent is not None:
+                out.append("\n" + self.indent * len(self.closing))
+            out.append(token)
+            self.opened = False
+        elif not self.closing:
+            raise ParseError("Invalid JSON provided.", self.offset + pos)
+        elif token == ",":
+            out.append(",")
+            if self.indent is not None:
+                out.append("\n" + self.indent * len(self.closing))
+        elif token == ":":
+            out.append(":" if self.indent is None else ": ")
+        else:
+            self.start_value(out, pos)
+            out.append(token)
+            self.in_string = token == '"'
+            self.escaped = False
+
+    def close(self) -> None:
+        if self.in_string:
+            raise ParseError("Parsing error. Unclosed quote", self.offset)
+        if self.closing:
+            raise ParseError("Parsing error. Unclosed bracket", self.offset)
+
+
+def continues_number(text: str) -> bool:
+    return text[:1] == "." or text[:1].isdecimal()
+
+
+def run(source: str | TextIO, formatter: Formatter, chunk_size: int) -> None:
+    if isinstance(source, str):
+        formatter.feed(source)
+    else:
+        for chunk in iter(lambda: source.read(chunk_size), ""):
+            formatter.feed(chunk)
+    formatter.close()
+
+
+def minify(source: str | TextIO, sink: TextIO, chunk_size: int = 65536) -> None:
+    run(source, Formatter(sink.write, None), chunk_size)
+
+
+# `indent` is a number of spaces or the string to indent with, as in json.dumps
+def reformat(
+    source: str | TextIO,
+    sink: TextIO,
+    indent: int | str = 4,
+    chunk_size: int = 65536,
+) -> None:
+    if isinstance(indent, int):
+        indent = " " * indent
+    run(source, Formatter(sink.write, indent), chunk_size)
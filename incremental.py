@@ -0,0 +1,193 @@
+from typing import Any
+
+from combinators import (
+    CompiledParser,
+    ParseError,
+    choice,
+    compile_parser,
+    forward,
+    sequence,
+    spanned,
+)
+from parse_json import dictionary_of, list_of, number, quotes, to_dictionary, whitespace
+
+
+class Span:
+    # `start` is relative to the parent container (absolute for the root),
+    # so an edit only shifts the containers that come after it in each of
+    # its ancestors. `children` holds the spans of nested containers only,
+    # in text order, and `keys` their index or key in the parent value.
+    # Shifts of the children are kept in `shifts`, a Fenwick tree made on
+    # the first edit, so shifting every later sibling is logarithmic
+    __slots__ = ("start", "length", "keys", "children", "shifts")
+
+    def __init__(
+        self, start: int, length: int, keys: list[Any], children: list["Span"]
+    ) -> None:
+        self.start = start
+        self.length = length
+        self.keys = keys
+        self.children = children
+        self.shifts: list[int] | None = None
+
+    def child_start(self, index: int) -> int:
+        start = self.children[index].start
+        if self.shifts is not None:
+            node = index + 1
+            while node:
+                start += self.shifts[node]
+                node &= node - 1
+        return start
+
+    def shift_after(self, index: int, delta: int) -> None:
+        # moves the children after `index` by `delta`
+        if self.shifts is None:
+            self.shifts = [0] * (len(self.children) + 1)
+        node = index + 2
+        while node < len(self.shifts):
+            self.shifts[node] += delta
+            node += node & -node
+
+    def find_child(self, offset: int) -> int:
+        # the last child starting at or before `offset`, -1 when there is none
+        low, high = 0, len(self.children)
+        while low < high:
+            middle = (low + high) // 2
+            if self.child_start(middle) <= offset:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+
+def to_list_span(found: tuple[list[tuple[Any, Span | None]], int, int]):
+    items, start, end = found
+    values = []
+    keys = []
+    children = []
+
+    for index, (item, span) in enumerate(items):
+        values.append(item)
+        if span is not None:
+            span.start -= start
+            keys.append(index)
+            children.append(span)
+
+    return values, Span(start, end - start, keys, children)
+
+
+def to_dictionary_span(found: tuple[list[tuple[str, Any]], int, int]):
+    pairs, start, end = found
+    keys = []
+    children = []
+
+    for key, (_, span) in pairs:
+        if span is not None:
+            span.start -= start
+            keys.append(key)
+            children.append(span)
+
+    values = to_dictionary([(key, item) for key, (item, _) in pairs])
+    return values, Span(start, end - start, keys, children)
+
+
+spanned_value = forward()
+spanned_list = spanned(list_of(spanned_value)).map(to_list_span)
+spanned_dictionary = spanned(dictionary_of(spanned_value, build=list)).map(
+    to_dictionary_span
+)
+spanned_value.define(
+    sequence(
+        whitespace,
+        choice(
+            quotes.map(lambda parsed: (parsed, None)),
+            spanned_list,
+            spanned_dictionary,
+            number.map(lambda parsed: (parsed, None)),
+        ),
+        pick=1,
+    )
+)
+
+spanned_document_parser = compile_parser(
+    sequence(whitespace, choice(spanned_dictionary, spanned_list), pick=1)
+)
+spanned_container_parser = compile_parser(choice(spanned_list, spanned_dictionary))
+
+
+def parse_spanned(
+    parser: CompiledParser, text: str, pos: int = 0
+) -> tuple[Any, Span, int]:
+    try:
+        found = parser.match(text, pos)
+    except ParseError as error:
+        raise ParseError("Invalid JSON provided.", error.pos) from error
+
+    if found is None:
+        raise ParseError("Invalid JSON provided.", pos)
+
+    (parsed, span), end = found
+    return parsed, span, end
+
+
+class JsonDocument:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.value, self.span, _ = parse_spanned(spanned_document_parser, text)
+
+    def apply_edit(self, start: int, end: int, replacement: str) -> None:
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError("Edit range is outside of the document")
+
+        text = self.text[:start] + replacement + self.text[end:]
+        delta = len(replacement) - (end - start)
+
+        # containers whose brackets enclose the edit, from the root down, as
+        # (span, absolute start, value, index in the parent's children)
+        path: list[tuple[Span, int, Any, int]] = []
+        span, base, value, index = self.span, self.span.start, self.value, -1
+        while base < start and end < base + span.length:
+            path.append((span, base, value, index))
+            index = span.find_child(start - base)
+            if index < 0:
+                break
+            value = value[span.keys[index]]
+            base += span.child_start(index)
+            span = span.children[index]
+
+        if not path:
+            self.value, self.span, _ = parse_spanned(spanned_document_parser, text)
+            self.text = text
+            return
+
+        # the container at each level starts at the same offset as before, so
+        # it either fails exactly like a full parse would or it parses; it can
+        # be spliced in when it still ends where the old one ended
+        for depth in range(len(path) - 1, -1, -1):
+            span, base, _, index = path[depth]
+            parsed, new_span, new_end = parse_spanned(
+                spanned_container_parser, text, base
+            )
+
+            if depth == 0:
+                self.value, self.span = parsed, new_span
+                break
+
+            if new_end == base + span.length + delta:
+                new_span.start = span.start
+                parent_span, _, parent_value, _ = path[depth - 1]
+                parent_span.children[index] = new_span
+                parent_value[parent_span.keys[index]] = parsed
+
+                if delta:
+                    for ancestor_depth in range(depth):
+                        ancestor = path[ancestor_depth][0]
+                        ancestor.length += delta
+                        ancestor.shift_after(path[ancestor_depth + 1][3], delta)
+                break
+
+        self.text = text
+
+
+def parse_document(string: str) -> JsonDocument:
+    return JsonDocument(string)
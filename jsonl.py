@@ -0,0 +1,86 @@
+import time
+from dataclasses import dataclass, field
+from io import StringIO
+from typing import Any, Iterator, TextIO
+
+from combinators import ParseError
+from parse_json import ParseJson
+
+
+@dataclass(frozen=True)
+class BadRecord:
+    line: int
+    # where parsing failed, counted from the start of the line; None when the
+    # error has no position, as when a hook raised it
+    offset: int | None
+    message: str
+
+
+@dataclass
+class JsonLinesReport:
+    good: int = 0
+    bad: int = 0
+    characters: int = 0
+    # time spent reading and parsing, not waiting for the consumer
+    seconds: float = 0.0
+    errors: list[BadRecord] = field(default_factory=list)
+
+    @property
+    def records_per_second(self) -> float:
+        return (self.good + self.bad) / self.seconds if self.seconds else 0.0
+
+    @property
+    def characters_per_second(self) -> float:
+        return self.characters / self.seconds if self.seconds else 0.0
+
+
+class JsonLinesReader:
+    # Yields the record on every non-blank line and skips bad lines, noting
+    # where they failed in `report`. A line is bad when it does not parse or
+    # when a hook or number converter raises on it. Every line is parsed on
+    # its own, so a bad record costs no more than a good one. Options are
+    # those of ParseJson.parse
+    def __init__(
+        self, source: str | TextIO, parser: ParseJson | None = None, **options: Any
+    ) -> None:
+        self.source = StringIO(source) if isinstance(source, str) else source
+        self.parser = parser or ParseJson()
+        self.options = options
+        self.report = JsonLinesReport()
+
+    def __iter__(self) -> Iterator[Any]:
+        report = self.report
+        raw_decode = self.parser.raw_decode
+        options = self.options
+
+        started = time.perf_counter()
+        for number, line in enumerate(self.source, 1):
+            report.characters += len(line)
+            if line.isspace() or not line:
+                continue
+
+            try:
+                parsed, end = raw_decode(line, **options)
+                if line[end:].strip():
+                    raise ParseError("Unexpected text after the record", end)
+            except ParseError as error:
+                # the generic error from ParseJson carries the cause
+                cause = error.__cause__
+                message = str(cause if isinstance(cause, ParseError) else error)
+                offset = error.pos if error.pos >= 0 else None
+                report.bad += 1
+                report.errors.append(BadRecord(number, offset, message))
+                continue
+            except Exception as error:
+                # hooks and converters may raise anything
+                message = f"{type(error).__name__}: {error}"
+                report.bad += 1
+                report.errors.append(BadRecord(number, None, message))
+                continue
+
+            report.good += 1
+            report.seconds += time.perf_counter() - started
+            yield parsed
+            started = time.perf_counter()
+
+        report.seconds += time.perf_counter() - started
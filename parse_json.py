@@ -1,103 +1,441 @@
+import json
+import operator
+import re
+from array import array
+from collections import Counter
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Any, Protocol
+from functools import lru_cache, partial
+from itertools import islice, repeat
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+from combinators import (
+    Combinator,
+    CompiledParser,
+    ParseError,
+    Parser,
+    Result,
+    bounded,
+    bracketed,
+    choice,
+    compile_parser,
+    counted,
+    expect,
+    fail,
+    forward,
+    literal,
+    nested,
+    regex,
+    result_from_tuple,
+    result_type,
+    sequence,
+)
+
+__all__ = [
+    "LazyNumber",
+    "Limits",
+    "ParseColon",
+    "ParseComma",
+    "ParseCurlyBrackets",
+    "ParseDictionary",
+    "ParseError",
+    "ParseJson",
+    "ParseKeyValuePair",
+    "ParseList",
+    "ParseMinus",
+    "ParseNumber",
+    "ParsePositiveNumber",
+    "ParseQuotes",
+    "ParseSquareBrackets",
+    "ParseWhiteSpace",
+    "Parser",
+    "register_engine",
+    "Result",
+    "result_from_tuple",
+    "result_type",
+]
+
+
+def normalize_number(token: str) -> str:
+    # a minus sign may be followed by whitespace, which is dropped here
+    if token[0] == "-" and token[1].isspace():
+        token = "-" + token[1:].lstrip()
+
+    if token[-1] == "." or token.count(".") > 1:
+        raise ParseError("Parsing error. Invalid number")
+
+    return token
+
+
+def to_number(token: str) -> int | float:
+    token = normalize_number(token)
+    try:
+        return float(token) if "." in token else int(token)
+    except ValueError as error:
+        # int() refuses numbers with too many digits
+        raise ParseError("Parsing error. Invalid number") from error
+
+
+def number_converter(
+    parse_float: Callable[[str], Any] | None = None,
+    parse_int: Callable[[str], Any] | None = None,
+) -> Callable[[str], Any]:
+    if parse_float is None and parse_int is None:
+        return to_number
+
+    to_float = float if parse_float is None else parse_float
+    to_int = int if parse_int is None else parse_int
+
+    def convert(token: str) -> Any:
+        token = normalize_number(token)
+        try:
+            return to_float(token) if "." in token else to_int(token)
+        except ValueError as error:
+            raise ParseError("Parsing error. Invalid number") from error
 
-result_type = str | float | int | list[Any] | dict[Any, Any] | tuple[str, Any] | None
+    return convert
 
 
-def result_from_tuple(
-    success, parsed: result_type = None, remainder: str | None = None
-):
-    return Result(success=success, parsed=parsed, remainder=remainder)
+def _operator(op: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    def method(self: "LazyNumber", other: Any) -> Any:
+        if isinstance(other, LazyNumber):
+            other = other.value
+        return op(self.value, other)
 
+    return method
 
-@dataclass
-class Result:
-    success: bool
-    parsed: result_type
-    remainder: str | None
 
-    def __iter__(self):
-        return iter((self.success, self.parsed, self.remainder))
+def _reflected(op: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    def method(self: "LazyNumber", other: Any) -> Any:
+        return op(other, self.value)
 
+    return method
 
-class Parser(Protocol):
-    def parse(self, string: str) -> Result:
-        ...
 
+class LazyNumber:
+    # keeps the number as text and converts it on first use
+    __slots__ = ("text", "convert", "_value")
+    _value: Any
 
-def safe_parse(parser: type[Parser], string: str) -> Result:
-    if not string:
-        return result_from_tuple(False)
+    def __init__(self, text: str, convert: Callable[[str], Any] = to_number) -> None:
+        self.text = text
+        self.convert = convert
 
-    return parser().parse(string)
+    @property
+    def value(self) -> Any:
+        # `_value` is only set once converted
+        try:
+            return self._value
+        except AttributeError:
+            self._value = self.convert(self.text)
+            return self._value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
 
+    def __bool__(self) -> bool:
+        return bool(self.value)
 
-def safe_parse_with_whitespace(parser: type[Parser], string: str) -> Result:
-    success, _, remainder = safe_parse(ParseWhiteSpace, string)
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"LazyNumber({self.text!r})"
+
+    def __int__(self) -> int:
+        return int(self.value)
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+    def __round__(self, ndigits: int | None = None) -> Any:
+        return round(self.value, ndigits)
+
+    def __neg__(self) -> Any:
+        return -self.value
+
+    def __pos__(self) -> Any:
+        return +self.value
+
+    def __abs__(self) -> Any:
+        return abs(self.value)
+
+    __eq__ = _operator(operator.eq)  # type: ignore[assignment]
+    __ne__ = _operator(operator.ne)  # type: ignore[assignment]
+    __lt__ = _operator(operator.lt)
+    __le__ = _operator(operator.le)
+    __gt__ = _operator(operator.gt)
+    __ge__ = _operator(operator.ge)
+    __add__ = _operator(operator.add)
+    __radd__ = _reflected(operator.add)
+    __sub__ = _operator(operator.sub)
+    __rsub__ = _reflected(operator.sub)
+    __mul__ = _operator(operator.mul)
+    __rmul__ = _reflected(operator.mul)
+    __truediv__ = _operator(operator.truediv)
+    __rtruediv__ = _reflected(operator.truediv)
+    __floordiv__ = _operator(operator.floordiv)
+    __rfloordiv__ = _reflected(operator.floordiv)
+    __mod__ = _operator(operator.mod)
+    __rmod__ = _reflected(operator.mod)
+    __pow__ = _operator(operator.pow)
+    __rpow__ = _reflected(operator.pow)
+
+
+def lazy_number_converter(convert: Callable[[str], Any]) -> Callable[[str], Any]:
+    def make_lazy(token: str) -> LazyNumber:
+        # the token is validated now so invalid documents still fail to parse;
+        # an integer int() may refuse for its length is converted to find out
+        number = LazyNumber(normalize_number(token), convert)
+        if len(number.text) > SAFE_INT_DIGITS and "." not in number.text:
+            number._value = convert(number.text)
+        return number
+
+    return make_lazy
+
+
+def to_dictionary(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+    result = dict(pairs)
+    if len(result) != len(pairs):
+        raise ParseError("Failed to parse a dictionary")
+    return result
+
+
+def to_pairs(pairs: list[tuple[str, Any]]) -> list[tuple[str, Any]]:
+    # rejects duplicate keys like to_dictionary without building the dict
+    if len({key for key, _ in pairs}) != len(pairs):
+        raise ParseError("Failed to parse a dictionary")
+    return pairs
+
+
+# does not match fancy "1e40"  floats
+NUMBER_PATTERN = r"-?\s*\d[\d.]*"
+# int() takes at least this many digits, whatever the limit is set to
+SAFE_INT_DIGITS = 640
+# numbers that normalize_number leaves as they are and int() accepts
+PLAIN_NUMBER_PATTERN = rf"-?(?:\d{{1,{SAFE_INT_DIGITS}}}|\d++\.\d++)(?![\d.])"
+# a quote preceded by a backslash does not close the string
+STRING_BODY_PATTERN = r'[^"]*+(?:(?<=\\)"[^"]*+)*+'
+QUOTES_PATTERN = f'"({STRING_BODY_PATTERN})"'
+
+whitespace = regex(r"\s*")
+match_whitespace = re.compile(r"\s*").match
+
+
+def skip_whitespace(string: str, pos: int) -> int:
+    # the end of the whitespace at `pos`; \s* always matches
+    return match_whitespace(string, pos).end()  # type: ignore[union-attr]
+
+
+# the next bracket outside of strings, an unclosed quote or the end
+BRACKET_PATTERN = re.compile(
+    rf'(?:"{STRING_BODY_PATTERN}"|[^"\[\]{{}}])*+([\[\]{{}}"]|\Z)'
+)
+
+
+def runs_past_end(string: str, pos: int) -> bool:
+    # whether the brackets opened from `pos` on, or a string, are still open
+    # at the end of `string`. Only then may a document that failed to parse
+    # be cut off; otherwise it fails however much text follows
+    depth = 0
+    while True:
+        found = BRACKET_PATTERN.match(string, pos)
+        token = found.group(1)  # type: ignore[union-attr]
+        if token == '"' or not token:
+            return True
+        depth += 1 if token in "[{" else -1
+        if depth <= 0:
+            return False
+        pos = found.end()  # type: ignore[union-attr]
 
-    if success and not remainder:
-        return result_from_tuple(False)
 
-    return safe_parse(parser, remainder if success else string)
+minus = literal("-")
+colon = literal(":")
+comma = sequence(whitespace, literal(","), pick=1)
 
+quotes = choice(
+    regex(QUOTES_PATTERN, group=1, first='"'),
+    sequence(literal('"'), fail("Parsing error. Unclosed quote")),
+)
+positive_number = regex(r"\d[\d.]*").map(to_number)
+
+
+def number_of(convert: Callable[[str], Any]) -> Combinator:
+    return choice(
+        regex(NUMBER_PATTERN).map(convert),
+        sequence(minus, fail("Failed to parse a number")),
+    )
 
-def try_parsers(
-    data_to_parse: str, parsers: list[type[Parser]]
-) -> tuple[str | float | int | list[Any] | dict[Any, Any], str]:
-    for parser in parsers:
-        child_success, child_parsed, child_remainder = safe_parse_with_whitespace(
-            parser, data_to_parse
-        )
 
-        if child_success:
-            data_to_parse = child_remainder
-            return child_parsed, data_to_parse
+def lazy_number_of(convert: Callable[[str], Any]) -> Combinator:
+    # a plain number is valid as matched, so it is wrapped without any other
+    # call; the rest are normalized and checked first
+    wrap: Callable[[str], Any] = LazyNumber
+    if convert is not to_number:
+        wrap = partial(LazyNumber, convert=convert)
+    return choice(
+        regex(PLAIN_NUMBER_PATTERN, first="-0123456789").map(wrap),
+        number_of(lazy_number_converter(convert)),
+    )
+
 
-    raise Exception("Failed to parse")
+number = number_of(to_number)
 
 
-def get_rid_of_comma_and_whitespaces(data_to_parse: str):
-    sucess_no_spaces, _, data_to_parse_no_whitespace = safe_parse(
-        ParseWhiteSpace, data_to_parse
+# items skip their own leading whitespace, as values and key-value pairs do
+def list_of(item: Combinator, max_items: int | None = None) -> Combinator:
+    return bracketed(
+        literal("["),
+        item,
+        comma,
+        sequence(whitespace, literal("]")),
+        "Failed to parse a list",
+        max_items,
     )
 
-    if sucess_no_spaces:
-        data_to_parse = data_to_parse_no_whitespace
 
-    if not data_to_parse:
-        return ""
+def key_value_pair_of(item: Combinator, key: Combinator = quotes) -> Combinator:
+    return sequence(
+        sequence(whitespace, key, pick=1), sequence(whitespace, colon, item, pick=2)
+    )
+
 
-    comma_success, _, data_to_parse = safe_parse_with_whitespace(
-        ParseComma, data_to_parse
+def dictionary_of(
+    item: Combinator,
+    build: Callable[[list[tuple[str, Any]]], Any] = to_dictionary,
+    max_items: int | None = None,
+    key: Combinator = quotes,
+) -> Combinator:
+    return bracketed(
+        literal("{"),
+        key_value_pair_of(item, key),
+        comma,
+        sequence(whitespace, literal("}")),
+        "Failed to parse a dictionary",
+        max_items,
+    ).map(build)
+
+
+value = forward()
+list_ = list_of(value)
+key_value_pair = key_value_pair_of(value)
+dictionary = dictionary_of(value)
+value.define(sequence(whitespace, choice(quotes, list_, dictionary, number), pick=1))
+
+
+@dataclass(frozen=True)
+class Limits:
+    max_depth: int | None = None
+    max_document_length: int | None = None
+    max_string_length: int | None = None
+    max_container_items: int | None = None
+    max_values: int | None = None
+
+
+def check_document_length(length: int, limits: Limits | None, pos: int = 0) -> None:
+    if limits is None or limits.max_document_length is None:
+        return
+    if length > limits.max_document_length:
+        raise ParseError("Document is too long", pos + limits.max_document_length)
+
+
+def string_length_checker(max_length: int) -> Callable[[str], str]:
+    def check(string: str) -> str:
+        if len(string) > max_length:
+            raise ParseError("String is too long")
+        return string
+
+    return check
+
+
+def json_grammar(
+    build_list: Callable[[list[Any]], Any] | None = None,
+    build_dictionary: Callable[[list[tuple[str, Any]]], Any] = to_dictionary,
+    convert_number: Callable[[str], Any] = to_number,
+    limits: Limits = Limits(),
+    lazy_numbers: bool = False,
+) -> Combinator:
+    string_rule = quotes
+    if limits.max_string_length is not None:
+        string_rule = quotes.map(string_length_checker(limits.max_string_length))
+
+    item = forward()
+    list_rule = list_of(item, limits.max_container_items)
+    if build_list is not None:
+        list_rule = list_rule.map(build_list)
+    dictionary_rule = dictionary_of(
+        item, build_dictionary, limits.max_container_items, string_rule
+    )
+    if limits.max_depth is not None:
+        list_rule = nested(list_rule, limits.max_depth)
+        dictionary_rule = nested(dictionary_rule, limits.max_depth)
+
+    if lazy_numbers:
+        number_rule = lazy_number_of(convert_number)
+    elif convert_number is to_number:
+        number_rule = number
+    else:
+        number_rule = number_of(convert_number)
+    value_rule = choice(string_rule, list_rule, dictionary_rule, number_rule)
+    if limits.max_values is not None:
+        value_rule = counted(value_rule, limits.max_values)
+    if limits.max_document_length is not None:
+        value_rule = bounded(value_rule, "Document is too long")
+
+    item.define(sequence(whitespace, value_rule, pick=1))
+    return sequence(whitespace, choice(dictionary_rule, list_rule), pick=1)
+
+
+@lru_cache(maxsize=32)
+def compile_document(
+    object_hook: Callable[[dict[str, Any]], Any] | None = None,
+    object_pairs_hook: Callable[[list[tuple[str, Any]]], Any] | None = None,
+    list_hook: Callable[[list[Any]], Any] | None = None,
+    parse_float: Callable[[str], Any] | None = None,
+    parse_int: Callable[[str], Any] | None = None,
+    lazy_numbers: bool = False,
+    limits: Limits | None = None,
+) -> CompiledParser:
+    build_dictionary: Callable[[list[tuple[str, Any]]], Any] = to_dictionary
+    # the pairs hook gets the pairs as parsed, duplicates included
+    if object_pairs_hook is not None:
+        build_dictionary = object_pairs_hook
+    elif object_hook is not None:
+        hook = object_hook
+        build_dictionary = lambda pairs: hook(to_dictionary(pairs))
+
+    return compile_parser(
+        json_grammar(
+            list_hook,
+            build_dictionary,
+            number_converter(parse_float, parse_int),
+            limits or Limits(),
+            lazy_numbers,
+        )
     )
 
-    # if there is something that is not a comma between last element and closing bracket eg [1,3 414]
-    if not comma_success:
-        raise Exception("Failed to parse")
 
-    # if ends with comma [2, ]
-    if not data_to_parse:
-        raise Exception("Failed to parse")
+document = json_grammar()
 
-    return data_to_parse
+quotes_parser = compile_parser(quotes)
+whitespace_parser = compile_parser(regex(r"\s+").map(lambda _: ""))
+positive_number_parser = compile_parser(positive_number)
+minus_parser = compile_parser(minus)
+colon_parser = compile_parser(colon)
+comma_parser = compile_parser(literal(","))
+number_parser = compile_parser(sequence(whitespace, number, pick=1))
+list_parser = compile_parser(sequence(whitespace, list_, pick=1))
+key_value_pair_parser = compile_parser(
+    expect(key_value_pair, "Failed to parse a key-value pair")
+)
+dictionary_parser = compile_parser(sequence(whitespace, dictionary, pick=1))
+record_parser = compile_parser(dictionary_of(value, build=to_pairs))
+value_parser = compile_parser(value)
 
 
 class ParseQuotes:
     def parse(self, string: str) -> Result:
-        if string[0] == '"':
-            string = string[1:]
-            end_quote_ind = -1
-            for i, l in enumerate(string):
-                if l == '"' and (i == 0 or string[i - 1] != "\\"):
-                    end_quote_ind = i
-                    break
-            if end_quote_ind == -1:
-                raise Exception("Parsing error. Unclosed quote")
-
-            return result_from_tuple(
-                True, string[:end_quote_ind], string[end_quote_ind + 1 :]
-            )
-        return result_from_tuple(False)
+        return quotes_parser.parse(string)
 
 
 class ParseCurlyBrackets:
@@ -167,196 +505,502 @@ class ParseSquareBrackets:
 
 class ParseWhiteSpace:
     def parse(self, string: str) -> Result:
-        if string[0].isspace():
-            last_conseq_space = 0
-            for i, l in enumerate(string):
-                if l.isspace():
-                    last_conseq_space = i
-                else:
-                    break
-
-            return result_from_tuple(True, "", string[last_conseq_space + 1 :])
-        return result_from_tuple(False)
+        return whitespace_parser.parse(string)
 
 
 class ParsePositiveNumber:
-    def __is_number(self, char: str) -> bool:
-        try:
-            _ = int(char)
-            return True
-        except ValueError:
-            return False
-
-    # does not match fancy "1e40"  floats
     def parse(self, string: str) -> Result:
-        if not self.__is_number(string[0]):
-            return result_from_tuple(False)
-
-        full_number = ""
-        is_float = False
-
-        for _, char in enumerate(string):
-            if self.__is_number(char):
-                full_number += char
-            elif char == ".":
-                if is_float:
-                    raise Exception("Parsing error. Invalid number")
-
-                is_float = True
-                full_number += "."
-
-            else:
-                break
-        if full_number[-1] == ".":
-            raise Exception("Parsing error. Invalid number")
-
-        return result_from_tuple(
-            True, (float if is_float else int)(full_number), string[len(full_number) :]
-        )
+        return positive_number_parser.parse(string)
 
 
 class ParseMinus:
     def parse(self, string: str) -> Result:
-        if string[0] == "-":
-            return result_from_tuple(True, "-", string[1:])
-
-        return result_from_tuple(False)
+        return minus_parser.parse(string)
 
 
 class ParseColon:
     def parse(self, string: str) -> Result:
-        if string[0] == ":":
-            return result_from_tuple(True, ":", string[1:])
-
-        return result_from_tuple(False)
+        return colon_parser.parse(string)
 
 
 class ParseComma:
     def parse(self, string: str) -> Result:
-        if string[0] == ",":
-            return result_from_tuple(True, ",", string[1:])
-
-        return result_from_tuple(False)
+        return comma_parser.parse(string)
 
 
 class ParseNumber:
     def parse(self, string: str) -> Result:
-        negative_success, _, remainder = ParseMinus().parse(string)
-        remainder = remainder if negative_success else string
+        return number_parser.parse(string)
 
-        success, parsed, remainder = safe_parse_with_whitespace(
-            ParsePositiveNumber, remainder
-        )
 
-        if not success and negative_success:
-            raise Exception("Failed to parse a number")
-        if success and negative_success:
-            parsed = -parsed
-        return result_from_tuple(success, parsed, remainder)
+class ParseList:
+    def parse(self, string: str) -> Result:
+        return list_parser.parse(string)
 
 
-class ParseList:
+class ParseKeyValuePair:
     def parse(self, string: str) -> Result:
-        success, data_to_parse, remainder = safe_parse_with_whitespace(
-            ParseSquareBrackets, string
+        return key_value_pair_parser.parse(string)
+
+
+class ParseDictionary:
+    def parse(self, string: str) -> Result:
+        return dictionary_parser.parse(string)
+
+
+class ParseJson:
+    # `engine` is "auto", "pure" or the name of a registered engine; stats
+    # counts the documents decoded by each engine
+    def __init__(self, engine: str = "auto") -> None:
+        if engine != "auto" and engine not in engines:
+            raise ValueError(f"Unknown engine {engine!r}")
+        self.engine = engine
+        self.stats: Counter[str] = Counter()
+
+    def parse(
+        self,
+        string: str,
+        object_hook: Callable[[dict[str, Any]], Any] | None = None,
+        object_pairs_hook: Callable[[list[tuple[str, Any]]], Any] | None = None,
+        list_hook: Callable[[list[Any]], Any] | None = None,
+        parse_float: Callable[[str], Any] | None = None,
+        parse_int: Callable[[str], Any] | None = None,
+        lazy_numbers: bool = False,
+        limits: Limits | None = None,
+    ) -> Any:
+        # the whole string is the document, so it can be rejected up front
+        check_document_length(len(string), limits)
+        parsed, _ = self.raw_decode(
+            string,
+            object_hook=object_hook,
+            object_pairs_hook=object_pairs_hook,
+            list_hook=list_hook,
+            parse_float=parse_float,
+            parse_int=parse_int,
+            lazy_numbers=lazy_numbers,
+            limits=limits,
         )
+        return parsed
+
+    # runs the batches on `executor` when given; compiled grammars and the
+    # per-call parse state are not shared, so any thread or process pool works
+    def parse_many(
+        self,
+        strings: Iterable[str],
+        executor: Executor | None = None,
+        batch_size: int = 256,
+        **options: Any,
+    ) -> list[Any]:
+        iterator = iter(strings)
+        batches = iter(lambda: list(islice(iterator, batch_size)), [])
+
+        parsed_batches: Iterator[tuple[list[Any], Counter[str]]]
+        if executor is None:
+            parsed_batches = (
+                parse_batch(batch, options, self.engine) for batch in batches
+            )
+        else:
+            parsed_batches = executor.map(
+                parse_batch, batches, repeat(options), repeat(self.engine)
+            )
 
-        result = []
-        if success:
-            while data_to_parse:
-                child_parsed, data_to_parse = try_parsers(
-                    data_to_parse,
-                    [ParseQuotes, ParseNumber, ParseList, ParseDictionary],
-                )
-                result.append(child_parsed)
+        parsed = []
+        for batch, stats in parsed_batches:
+            parsed.extend(batch)
+            self.stats.update(stats)
+        return parsed
+
+    # options are the keyword arguments of `parse`
+    def raw_decode(
+        self, string: str, start: int = 0, **options: Any
+    ) -> tuple[Any, int]:
+        for name in engine_order(self.engine):
+            found = engines[name](string, start, options)
+            if found is not None:
+                break
+        else:
+            # only when the pure engine was replaced by one that declines
+            raise ParseError("Invalid JSON provided.", start)
+        self.stats[name] += 1
+
+        parsed, end = found
+        check_document_length(end - start, options.get("limits"), start)
+        return parsed, end
+
+    def iter_documents(
+        self, source: str | TextIO, chunk_size: int = 65536, **options: Any
+    ) -> Iterator[Any]:
+        if isinstance(source, str):
+            pos = skip_whitespace(source, 0)
+            while pos < len(source):
+                parsed, pos = self.raw_decode(source, pos, **options)
+                yield parsed
+                pos = skip_whitespace(source, pos)
+            return
+
+        buffer = ""
+        pos = 0
+        at_end = False
+        while True:
+            pos = skip_whitespace(buffer, pos)
+            if pos == len(buffer):
+                if at_end:
+                    return
+                buffer, pos = source.read(chunk_size), 0
+                at_end = not buffer
+                continue
 
-                sucess_no_spaces, _, data_to_parse_no_whitespace = safe_parse(
-                    ParseWhiteSpace, data_to_parse
+            try:
+                parsed, pos = self.raw_decode(buffer, pos, **options)
+            except ParseError:
+                # the document may just be cut off by the end of the buffer;
+                # reading at least as much as is buffered keeps the number of
+                # retries logarithmic in the document size
+                if at_end or not runs_past_end(buffer, pos):
+                    raise
+                check_document_length(len(buffer) - pos, options.get("limits"), pos)
+                more = source.read(max(chunk_size, len(buffer) - pos))
+                at_end = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+
+            yield parsed
+
+    # `types` maps field names to array typecodes; other fields become lists.
+    # A record without a field gets None in a list column and is an error in
+    # a typed one
+    def parse_columns(
+        self,
+        source: str | TextIO,
+        fields: Iterable[str],
+        types: dict[str, str] | None = None,
+        chunk_size: int = 65536,
+    ) -> dict[str, list[Any] | array]:  # type: ignore[type-arg]
+        # a field asked for twice gets one column
+        names = list(dict.fromkeys(fields))
+        types = types or {}
+        columns: dict[str, list[Any] | array] = {  # type: ignore[type-arg]
+            name: array(types[name]) if name in types else [] for name in names
+        }
+        slots = {name: slot for slot, name in enumerate(names)}
+
+        if isinstance(source, str):
+            buffer, read = source, None
+        else:
+            buffer, read = "", source.read
+        offset = pos = 0
+        state = "start"
+        while True:
+            pos = skip_whitespace(buffer, pos)
+            row = None
+            try:
+                if pos == len(buffer):
+                    raise ParseError("Invalid JSON provided.", pos)
+                if state == "start":
+                    if buffer[pos] != "[":
+                        raise ParseError("Expected a list of records", pos)
+                    pos += 1
+                    state = "first"
+                elif buffer[pos] == "]" and state != "record":
+                    return columns
+                elif state == "separator":
+                    if buffer[pos] != ",":
+                        raise ParseError("Failed to parse a list", pos)
+                    pos += 1
+                    state = "record"
+                else:
+                    row = [missing] * len(names)
+                    pos = read_record(buffer, pos, slots, row, self.engine)
+                    state = "separator"
+            except (ParseError, RecursionError) as error:
+                # as in iter_documents, a record cut off by the end of the
+                # buffer is retried once more has been read; brackets and
+                # separators fail for good unless the buffer ran out first
+                cut_off = pos == len(buffer) or (
+                    row is not None and runs_past_end(buffer, pos)
                 )
+                more = ""
+                if read and cut_off:
+                    more = read(max(chunk_size, len(buffer) - pos))
+                if not more:
+                    if isinstance(error, ParseError) and error.pos >= 0:
+                        pos = error.pos
+                    raise ParseError("Invalid JSON provided.", offset + pos) from error
+                buffer, offset, pos = buffer[pos:] + more, offset + pos, 0
+                continue
 
-                if sucess_no_spaces:
-                    data_to_parse = data_to_parse_no_whitespace
+            if row is not None:
+                append_row(columns, names, row, offset + pos)
 
-                if not data_to_parse:
-                    break
 
-                comma_success, _, data_to_parse = safe_parse_with_whitespace(
-                    ParseComma, data_to_parse
-                )
+def decode(
+    parser: CompiledParser, string: str, start: int = 0, bound: int | None = None
+) -> tuple[Any, int]:
+    try:
+        found = parser.match(string, start, bound)
+    except ParseError as error:
+        pos = error.pos if error.pos >= 0 else start
+        raise ParseError("Invalid JSON provided.", pos) from error
+    except RecursionError as error:
+        raise ParseError("Invalid JSON provided.", start) from error
 
-                # if there is something that is not a comma between last element and closing bracket eg [1,3 414]
-                if not comma_success:
-                    raise Exception("Failed to parse a list")
+    if found is None:
+        raise ParseError("Invalid JSON provided.", start)
 
-                # if ends with comma [2, ]
-                if not data_to_parse:
-                    raise Exception("Failed to parse a list")
+    return found
 
-            return result_from_tuple(True, result, remainder)
-        return result_from_tuple(False)
 
+def parse_batch(
+    strings: list[str], options: dict[str, Any], engine: str = "auto"
+) -> tuple[list[Any], Counter[str]]:
+    parser = ParseJson(engine)
+    parsed = [parser.parse(string, **options) for string in strings]
+    return parsed, parser.stats
 
-class ParseKeyValuePair:
-    def parse(self, string: str) -> Result:
-        # key can only be a string
-        child_success, key, data_to_parse = safe_parse_with_whitespace(
-            ParseQuotes, string
-        )
 
-        if not child_success:
-            raise Exception("Failed to parse a key-value pair")
+# An engine decodes the document at `start` with the given `parse` options and
+# returns it with its end, or None when it cannot give the same result as the
+# pure parser. "auto" tries every other engine before the pure one
+Engine = Callable[[str, int, dict[str, Any]], tuple[Any, int] | None]
 
-        child_success, _, data_to_parse = safe_parse_with_whitespace(
-            ParseColon, data_to_parse
-        )
-        if not child_success:
-            raise Exception("Failed to parse a key-value pair")
 
-        value, remainder = try_parsers(
-            data_to_parse, [ParseQuotes, ParseNumber, ParseList, ParseDictionary]
-        )
+def pure_engine(string: str, start: int, options: dict[str, Any]) -> tuple[Any, int]:
+    # a document may be followed by others, so its length limit is enforced
+    # while parsing rather than by looking at the rest of the string
+    limits = options.get("limits")
+    bound = None
+    if limits is not None and limits.max_document_length is not None:
+        bound = start + limits.max_document_length
+    return decode(compile_document(**options), string, start, bound)
 
-        result: tuple[str, Any] = (key, value)
 
-        return result_from_tuple(True, result, remainder)
+# json nests far deeper than the pure parser, which reads at least this many
+# levels at the default recursion limit; deeper documents are left to it so
+# that every engine fails on them alike
+MAX_STDLIB_DEPTH = 200
 
 
-class ParseDictionary:
-    def parse(self, string: str) -> Result:
-        success, data_to_parse, remainder = safe_parse_with_whitespace(
-            ParseCurlyBrackets, string
-        )
+def stdlib_safe_pattern(depth: int) -> str:
+    # Documents made only of these are read the same way by json: without
+    # backslashes strings are raw either way, and there are no literals,
+    # exponents or non-ASCII whitespace. Numbers json rejects, like "01" or
+    # "- 1", fall back. Each level of brackets is a copy of the pattern, so
+    # nesting deeper than `depth` does not match
+    pattern = r'(?:"[^"\\]*+"|[ \t\n\r,:0-9.-]++)*+'
+    for _ in range(depth):
+        pattern = rf'(?:"[^"\\]*+"|[ \t\n\r,:0-9.-]++|[\[{{]{pattern}[\]}}])*+'
+    return pattern
 
-        result: dict[str, Any] = {}
 
-        if success:
-            while data_to_parse:
-                success, parsed, data_to_parse = safe_parse_with_whitespace(
-                    ParseKeyValuePair, data_to_parse
-                )
-                key, value = parsed
-                if key in result:
-                    raise Exception("Failed to parse a dictionary")
+STDLIB_SAFE_PATTERN = re.compile(stdlib_safe_pattern(MAX_STDLIB_DEPTH))
+skip_json_whitespace = re.compile(r"[ \t\n\r]*").match
+stdlib_decoder = json.JSONDecoder(object_pairs_hook=to_dictionary, strict=False)
 
-                result[key] = value
 
-                data_to_parse = get_rid_of_comma_and_whitespaces(data_to_parse)
+def stdlib_engine(
+    string: str, start: int, options: dict[str, Any]
+) -> tuple[Any, int] | None:
+    if any(options.values()):
+        return None
 
-            return result_from_tuple(True, result, remainder)
+    pos = skip_json_whitespace(string, start).end()  # type: ignore[union-attr]
+    if not string.startswith(("{", "["), pos):
+        return None
 
-        return result_from_tuple(False)
+    try:
+        parsed, end = stdlib_decoder.raw_decode(string, pos)
+    except (ValueError, ParseError, RecursionError):
+        return None
 
+    if not STDLIB_SAFE_PATTERN.fullmatch(string, pos, end):
+        return None
+    return parsed, end
 
-class ParseJson:
-    def parse(self, string: str) -> list[Any] | dict[Any, Any]:
-        parsers: list[type[Parser]] = [ParseDictionary, ParseList]
-        for parser in parsers:
-            try:
-                _, result, _ = parser().parse(string)
 
-                if result is not None:
-                    return result
-            except Exception:
-                pass
+engines: dict[str, Engine] = {"pure": pure_engine, "stdlib": stdlib_engine}
+
+
+def register_engine(name: str, engine: Engine) -> None:
+    engines[name] = engine
+
+
+def engine_order(engine: str) -> list[str]:
+    if engine == "auto":
+        return [name for name in engines if name != "pure"] + ["pure"]
+    if engine == "pure":
+        return ["pure"]
+    return [engine, "pure"]
+
 
-        raise Exception("Invalid JSON provided.")
+# a row slot that no field of the record filled
+missing = object()
+
+
+def skipped_value_pattern(depth: int) -> str:
+    # scalars, and lists of them nested at most `depth` deep, with numbers
+    # that int() and float() accept. Dictionaries are left to scan_dictionary,
+    # which checks their keys
+    scalar = (
+        rf'"{STRING_BODY_PATTERN}"'
+        rf"|-?\s*+\d{{1,{SAFE_INT_DIGITS}}}(?:\.\d++)?(?![\d.])"
+    )
+    pattern = scalar
+    for _ in range(depth):
+        pattern = rf"{scalar}|\[\s*+(?:(?:{pattern})\s*+(?:,\s*+(?!\])|(?=\])))*+\]"
+    return pattern
+
+
+SKIPPED_VALUE = re.compile(skipped_value_pattern(4))
+OPENING = re.compile(r"([\[{])\s*+")
+FIELD = re.compile(rf'"({STRING_BODY_PATTERN})"\s*+:\s*+')
+ITEM_END = re.compile(r"\s*+([,\]}])\s*+")
+SCALAR = re.compile(rf'"({STRING_BODY_PATTERN})"|({NUMBER_PATTERN})')
+
+# how deep scan_dictionary follows nested containers before giving up
+MAX_SCAN_DEPTH = 100
+
+
+def scan_dictionary(
+    string: str,
+    pos: int,
+    slots: dict[str, int] | None = None,
+    row: list[Any] | None = None,
+    depth: int = 0,
+) -> int | None:
+    # Reads the dictionary at `pos` with regular expressions and returns its
+    # end. Values of keys in `slots` are put in `row`; the rest are skipped
+    # without building them. Returns None for anything it cannot vouch for,
+    # from errors to deep nesting, which the grammar then reads
+    found = OPENING.match(string, pos)
+    if found is None or found.group(1) != "{":
+        return None
+    pos = found.end()
+    if string.startswith("}", pos):
+        return pos + 1
+
+    keys = set()
+    while True:
+        found = FIELD.match(string, pos)
+        if found is None:
+            return None
+        key = found.group(1)
+        if key in keys:
+            return None
+        keys.add(key)
+        pos = found.end()
+
+        slot = None if slots is None else slots.get(key)
+        if slot is None:
+            end = skip_value(string, pos, depth)
+            if end is None:
+                return None
+            pos = end
+        else:
+            found = SCALAR.match(string, pos)
+            if found is None:
+                parsed = value_parser.match(string, pos)
+                if parsed is None:
+                    return None
+                row[slot], pos = parsed  # type: ignore[index]
+            elif found.group(2) is None:
+                row[slot], pos = found.group(1), found.end()  # type: ignore[index]
+            else:
+                try:
+                    row[slot] = to_number(found.group(2))  # type: ignore[index]
+                except ParseError:
+                    return None
+                pos = found.end()
+
+        found = ITEM_END.match(string, pos)
+        if found is None or found.group(1) == "]":
+            return None
+        if found.group(1) == "}":
+            return found.start(1) + 1
+        pos = found.end()
+
+
+def scan_list(string: str, pos: int, depth: int) -> int | None:
+    found = OPENING.match(string, pos)
+    if found is None or found.group(1) != "[":
+        return None
+    pos = found.end()
+    if string.startswith("]", pos):
+        return pos + 1
+
+    while True:
+        end = skip_value(string, pos, depth)
+        if end is None:
+            return None
+        found = ITEM_END.match(string, end)
+        if found is None or found.group(1) == "}":
+            return None
+        if found.group(1) == "]":
+            return found.start(1) + 1
+        pos = found.end()
+
+
+def skip_value(string: str, pos: int, depth: int) -> int | None:
+    found = SKIPPED_VALUE.match(string, pos)
+    if found is not None:
+        return found.end()
+    if depth == MAX_SCAN_DEPTH:
+        return None
+    if string.startswith("{", pos):
+        return scan_dictionary(string, pos, depth=depth + 1)
+    return scan_list(string, pos, depth + 1)
+
+
+def read_record(
+    string: str,
+    pos: int,
+    slots: dict[str, int],
+    row: list[Any],
+    engine: str = "auto",
+) -> int:
+    # fills `row` with the values of the requested keys of the dictionary at
+    # `pos` and returns its end. Engines other than the pure one read whole
+    # records; otherwise unrequested values are skipped by scan_dictionary,
+    # and the grammar only sees records both gave up on
+    if string.startswith("{", pos):
+        for name in engine_order(engine)[:-1]:
+            found = engines[name](string, pos, {})
+            if found is not None:
+                record, end = found
+                for key in record.keys() & slots.keys():
+                    row[slots[key]] = record[key]
+                return end
+
+    scanned = scan_dictionary(string, pos, slots, row)
+    if scanned is not None:
+        return scanned
+
+    # the scan may have filled slots before giving up; the grammar fills the
+    # same ones with the same values
+    found = record_parser.match(string, pos)
+    if found is None:
+        raise ParseError("Failed to parse a dictionary", pos)
+
+    pairs, end = found
+    for key, item in pairs:
+        slot = slots.get(key)
+        if slot is not None:
+            row[slot] = item
+    return end
+
+
+def append_row(
+    columns: dict[str, list[Any] | array],  # type: ignore[type-arg]
+    names: list[str],
+    row: list[Any],
+    pos: int,
+) -> None:
+    for name, item in zip(names, row):
+        column = columns[name]
+        if item is missing:
+            if isinstance(column, array):
+                raise ParseError(f"Missing field {name!r}", pos)
+            item = None
+        try:
+            column.append(item)
+        except (TypeError, OverflowError) as error:
+            raise ParseError(f"Invalid value for field {name!r}", pos) from error
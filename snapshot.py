@@ -0,0 +1,336 @@
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from itertools import accumulate
+from operator import call
+from typing import Any, BinaryIO
+
+from parse_json import ParseJson
+
+SNAPSHOT_SUFFIX = ".snapshot"
+MAGIC = b"JSONSNP2"
+# magic, source mtime in ns, source size, the byte size of every section, the
+# array typecodes of the packed ones and a checksum of the sections
+HEADER = struct.Struct("<8sqq12Q6sI")
+
+STRING = 0
+INT = 1
+FLOAT = 2
+BIG_INT = 3
+LIST = 4
+DICTIONARY = 5
+
+INT_MIN = -(2**63)
+INT_MAX = 2**63 - 1
+
+# strings are stored apart by NUL unless one of them holds it, and then with
+# their lengths
+SEPARATOR = "\0"
+
+
+class SnapshotWriter:
+    # The tree is flattened into streams read back in the same order: the
+    # shape of every container, the scalars grouped by type and a table of
+    # keys, so loading never has to search anything. A shape is the kind of
+    # a container with its keys and the tags of its values; records of the
+    # same layout share one, so their tags and keys are stored only once.
+    def __init__(self) -> None:
+        self.root = STRING
+        self.shape_ids: dict[tuple[int, tuple[str, ...], bytes], int] = {}
+        self.containers: list[int] = []
+        self.strings: list[str] = []
+        self.ints = array("q")
+        self.floats = array("d")
+
+    def add(self, value: Any) -> None:
+        self.root = tag_of(value)
+        self.add_value(self.root, value)
+
+    def add_value(self, tag: int, value: Any) -> None:
+        if tag == STRING:
+            self.strings.append(value)
+        elif tag == INT:
+            self.ints.append(value)
+        elif tag == FLOAT:
+            self.floats.append(value)
+        elif tag == BIG_INT:
+            self.strings.append(str(value))
+        else:
+            self.add_container(tag, value)
+
+    def add_container(self, kind: int, value: Any) -> None:
+        keys: tuple[str, ...] = ()
+        items = value
+        if kind == DICTIONARY:
+            keys = tuple(value)
+            for key in keys:
+                if type(key) is not str:
+                    raise TypeError(f"Cannot snapshot a {type(key).__name__} key")
+            items = value.values()
+
+        tags = bytes(map(tag_of, items))
+        shape = (kind, keys, tags)
+        self.containers.append(self.shape_ids.setdefault(shape, len(self.shape_ids)))
+        for tag, item in zip(tags, items):
+            self.add_value(tag, item)
+
+    def sections(self) -> tuple[list[bytes], bytes]:
+        # the sections and the typecodes of those holding numbers
+        key_ids: dict[str, int] = {}
+        shape_kinds = bytearray()
+        shape_sizes = []
+        shape_tags = bytearray()
+        shape_keys = []
+        for kind, keys, tags in self.shape_ids:
+            shape_kinds.append(kind)
+            shape_sizes.append(len(tags))
+            shape_tags += tags
+            for key in keys:
+                shape_keys.append(key_ids.setdefault(key, len(key_ids)))
+
+        key_blob, key_lengths = joined(list(key_ids))
+        string_blob, string_lengths = joined(self.strings)
+        numbers = [
+            smallest(shape_sizes),
+            smallest(shape_keys),
+            smallest(self.containers),
+            smallest(key_lengths),
+            smallest(string_lengths),
+            smallest(self.ints, signed=True),
+        ]
+        sections = [
+            bytes([self.root]),
+            bytes(shape_kinds),
+            packed(numbers[0]),
+            bytes(shape_tags),
+            packed(numbers[1]),
+            packed(numbers[2]),
+            key_blob,
+            packed(numbers[3]),
+            string_blob,
+            packed(numbers[4]),
+            packed(numbers[5]),
+            packed(self.floats),
+        ]
+        return sections, "".join(array.typecode for array in numbers).encode()
+
+
+def tag_of(value: Any) -> int:
+    kind = type(value)
+    if kind is str:
+        return STRING
+    if kind is int:
+        return INT if INT_MIN <= value <= INT_MAX else BIG_INT
+    if kind is float:
+        return FLOAT
+    if kind is list:
+        return LIST
+    if kind is dict:
+        return DICTIONARY
+    raise TypeError(f"Cannot snapshot a {kind.__name__}")
+
+
+def joined(strings: list[str]) -> tuple[bytes, list[int]]:
+    # the strings as one blob, and their lengths when it cannot be split on
+    # the separator
+    text = SEPARATOR.join(strings)
+    if text.count(SEPARATOR) == max(len(strings) - 1, 0):
+        return text.encode(), []
+    return "".join(strings).encode(), [len(string) for string in strings]
+
+
+def smallest(numbers: Any, signed: bool = False) -> array:  # type: ignore[type-arg]
+    # the numbers in the narrowest array that holds them all
+    low, high = min(numbers, default=0), max(numbers, default=0)
+    for typecode in "bhiq" if signed else "BHIQ":
+        bits = 8 * array(typecode).itemsize
+        if signed and -(2 ** (bits - 1)) <= low and high < 2 ** (bits - 1):
+            break
+        if not signed and high < 2**bits:
+            break
+    return array(typecode, numbers)
+
+
+def packed(numbers: array) -> bytes:  # type: ignore[type-arg]
+    if sys.byteorder == "big":
+        numbers = array(numbers.typecode, numbers)
+        numbers.byteswap()
+    return numbers.tobytes()
+
+
+def unpacked(typecode: str, data: bytes) -> list[Any]:
+    numbers = array(typecode)
+    numbers.frombytes(data)
+    if sys.byteorder == "big":
+        numbers.byteswap()
+    return numbers.tolist()
+
+
+def split(blob: bytes, lengths: list[int]) -> list[str]:
+    text = blob.decode()
+    if not lengths:
+        return text.split(SEPARATOR)
+    ends = list(accumulate(lengths))
+    return [text[end - length : end] for end, length in zip(ends, lengths)]
+
+
+def dump_snapshot(
+    value: Any, file: BinaryIO, source_mtime_ns: int = 0, source_size: int = 0
+) -> None:
+    writer = SnapshotWriter()
+    writer.add(value)
+    sections, typecodes = writer.sections()
+
+    file.write(
+        HEADER.pack(
+            MAGIC,
+            source_mtime_ns,
+            source_size,
+            *(len(data) for data in sections),
+            typecodes,
+            checksum(sections),
+        )
+    )
+    for data in sections:
+        file.write(data)
+
+
+def checksum(sections: list[bytes]) -> int:
+    crc = 0
+    for data in sections:
+        crc = zlib.crc32(data, crc)
+    return crc
+
+
+def read_header(file: BinaryIO) -> tuple[int, int, list[int], str, int]:
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("Not a snapshot")
+
+    magic, source_mtime_ns, source_size, *lengths, typecodes, crc = HEADER.unpack(
+        header
+    )
+    if magic != MAGIC:
+        raise ValueError("Not a snapshot")
+
+    return source_mtime_ns, source_size, lengths, typecodes.decode(), crc
+
+
+def load_snapshot(file: BinaryIO) -> Any:
+    _, _, lengths, typecodes, crc = read_header(file)
+    sections = [file.read(length) for length in lengths]
+    if [len(data) for data in sections] != lengths or file.read(1):
+        raise ValueError("Truncated snapshot")
+    if checksum(sections) != crc:
+        raise ValueError("Corrupt snapshot")
+
+    (
+        root,
+        shape_kinds,
+        shape_sizes,
+        shape_tags,
+        shape_keys,
+        containers,
+        key_blob,
+        key_lengths,
+        string_blob,
+        string_lengths,
+        ints,
+        floats,
+    ) = sections
+    (
+        size_type,
+        key_ref_type,
+        container_type,
+        key_length_type,
+        string_length_type,
+        int_type,
+    ) = list(typecodes)
+
+    key_table = split(key_blob, unpacked(key_length_type, key_lengths))
+    strings = split(string_blob, unpacked(string_length_type, string_lengths))
+    next_string = iter(strings).__next__
+    container_iterator = iter(unpacked(container_type, containers))
+    next_container = container_iterator.__next__
+
+    # every stream is in the order the writer visited the tree; a container
+    # calls the getter of each of its values, C-level ones for scalars
+    def build() -> Any:
+        keys, getters = shapes[next_container()]
+        values = map(call, getters)
+        return list(values) if keys is None else dict(zip(keys, values))
+
+    getter_of = [
+        next_string,
+        iter(unpacked(int_type, ints)).__next__,
+        iter(unpacked("d", floats)).__next__,
+        lambda: int(next_string()),
+        build,
+        build,
+    ]
+
+    shapes: list[tuple[tuple[str, ...] | None, tuple[Any, ...]]] = []
+    key_refs = iter(unpacked(key_ref_type, shape_keys))
+    start = 0
+    for kind, size in zip(shape_kinds, unpacked(size_type, shape_sizes)):
+        getters = tuple(map(getter_of.__getitem__, shape_tags[start : start + size]))
+        keys = None
+        if kind == DICTIONARY:
+            keys = tuple(key_table[next(key_refs)] for _ in range(size))
+        shapes.append((keys, getters))
+        start += size
+
+    value = getter_of[root[0]]()
+    if next(container_iterator, None) is not None:
+        raise ValueError("Corrupt snapshot")
+    return value
+
+
+def snapshot_path(path: str) -> str:
+    return path + SNAPSHOT_SUFFIX
+
+
+def parse_file(path: str, cache: bool = True) -> Any:
+    with open(path, encoding="utf-8") as source:
+        # taken before reading, so a change made meanwhile is not cached
+        stat = os.fstat(source.fileno())
+
+        if cache:
+            try:
+                with open(snapshot_path(path), "rb") as file:
+                    mtime_ns, size, *_ = read_header(file)
+                    if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+                        file.seek(0)
+                        return load_snapshot(file)
+            except Exception:
+                # a missing, truncated or corrupt snapshot is made again
+                pass
+
+        parsed = ParseJson().parse(source.read())
+
+    if cache:
+        # the snapshot only saves time next time, so a read-only directory or
+        # a full disk is no reason to fail
+        try:
+            save_snapshot(parsed, path, stat)
+        except OSError:
+            pass
+
+    return parsed
+
+
+def save_snapshot(value: Any, path: str, stat: os.stat_result) -> None:
+    # written next to the snapshot under a unique name and moved in place,
+    # so readers never see a partial file
+    directory = os.path.dirname(snapshot_path(path)) or "."
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            dump_snapshot(value, file, stat.st_mtime_ns, stat.st_size)
+        os.replace(temporary, snapshot_path(path))
+    except BaseException:
+        os.unlink(temporary)
+        raise
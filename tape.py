@@ -0,0 +1,270 @@
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Any, Iterator, Sequence
+
+from combinators import ParseError
+from parse_json import ParseJson
+
+# Every match ends at the next bracket, comma or colon outside of a string,
+# with the same quote rules as ParseQuotes. An unclosed quote ends the match
+# with a lone '"', and the end of the data with an empty group.
+STRUCTURE_PATTERN = re.compile(
+    rb'(?:"[^"]*+(?:(?<=\\)"[^"]*+)*+"|[^"\[\]{},:])*+([\[\]{},:]|"|$)'
+)
+
+COMMA = -1
+COLON = -2
+
+SIDECAR_SUFFIX = ".tape"
+# magic, byte order, source mtime in ns, source size, number of tokens and the
+# array typecodes of the offsets and the jumps
+HEADER = struct.Struct("<8s8sqqq1s1s")
+MAGIC = b"JSONTAP2"
+
+
+class Tape:
+    # `offsets` holds the byte offset of every structural token. For a bracket
+    # `jumps` holds the index of its partner: later for an opening bracket and
+    # earlier for a closing one. Commas and colons are marked COMMA and COLON.
+    def __init__(self, offsets: Sequence[int], jumps: Sequence[int]) -> None:
+        self.offsets = offsets
+        self.jumps = jumps
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+def typecodes(size: int) -> tuple[str, str]:
+    # offsets and jumps are below the size of the data, so they fit in 32 bits
+    # for anything smaller than 2 GB
+    if size < 2**31:
+        return "I", "i"
+    return "q", "q"
+
+
+def build_tape(data: bytes | mmap.mmap) -> Tape:
+    offset_type, jump_type = typecodes(len(data))
+    offsets = array(offset_type)
+    jumps = array(jump_type)
+    stack: list[int] = []
+
+    for found in STRUCTURE_PATTERN.finditer(data):  # type: ignore[arg-type]
+        token = found.group(1)
+        if not token:
+            break
+
+        pos = found.start(1)
+        if token == b"[" or token == b"{":
+            stack.append(len(offsets))
+            jumps.append(0)
+        elif token == b"]" or token == b"}":
+            if not stack:
+                raise ParseError("Parsing error. Unopened bracket", pos)
+            opening = stack.pop()
+            if data[offsets[opening]] != (b"[" if token == b"]" else b"{")[0]:
+                raise ParseError("Parsing error. Mismatched bracket", pos)
+            jumps[opening] = len(offsets)
+            jumps.append(opening)
+        elif token == b",":
+            jumps.append(COMMA)
+        elif token == b":":
+            jumps.append(COLON)
+        else:
+            raise ParseError("Parsing error. Unclosed quote", pos)
+        offsets.append(pos)
+
+    if stack:
+        raise ParseError("Parsing error. Unclosed bracket", offsets[stack[-1]])
+
+    return Tape(offsets, jumps)
+
+
+def sidecar_path(path: str) -> str:
+    return path + SIDECAR_SUFFIX
+
+
+def save_tape(tape: Tape, path: str, stat: os.stat_result) -> None:
+    # `stat` is that of the source the tape was built from, taken before
+    # reading it, so a change made while building invalidates the sidecar
+    directory = os.path.dirname(sidecar_path(path)) or "."
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as sidecar:
+            sidecar.write(
+                HEADER.pack(
+                    MAGIC,
+                    sys.byteorder.encode().ljust(8),
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    len(tape),
+                    tape.offsets.typecode.encode(),  # type: ignore[attr-defined]
+                    tape.jumps.typecode.encode(),  # type: ignore[attr-defined]
+                )
+            )
+            sidecar.write(memoryview(tape.offsets).cast("B"))  # type: ignore[arg-type]
+            sidecar.write(memoryview(tape.jumps).cast("B"))  # type: ignore[arg-type]
+        os.replace(temporary, sidecar_path(path))
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_tape(path: str, stat: os.stat_result) -> tuple[Tape, mmap.mmap] | None:
+    # returns None when there is no sidecar or it was made for another
+    # version of the source than the one `stat` describes
+    try:
+        sidecar = open(sidecar_path(path), "rb")
+    except FileNotFoundError:
+        return None
+
+    with sidecar:
+        header = sidecar.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+
+        magic, byteorder, mtime_ns, size, count, offset_type, jump_type = HEADER.unpack(
+            header
+        )
+        if (
+            magic != MAGIC
+            or byteorder.strip() != sys.byteorder.encode()
+            or mtime_ns != stat.st_mtime_ns
+            or size != stat.st_size
+            or (offset_type.decode(), jump_type.decode()) != typecodes(size)
+        ):
+            return None
+
+        offset_end = HEADER.size + array(offset_type.decode()).itemsize * count
+        jump_size = array(jump_type.decode()).itemsize
+        if os.fstat(sidecar.fileno()).st_size != offset_end + jump_size * count:
+            return None
+
+        mapped = mmap.mmap(sidecar.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    offsets = view[HEADER.size : offset_end].cast(offset_type.decode())
+    jumps = view[offset_end:].cast(jump_type.decode())
+    return Tape(offsets, jumps), mapped
+
+
+class IndexedJson:
+    def __init__(self, path: str, cache: bool = True) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._sidecar: mmap.mmap | None = None
+        self.data: bytes | mmap.mmap = b""
+
+        # the file and the maps are closed again when anything below fails
+        try:
+            stat = os.fstat(self._file.fileno())
+            if stat.st_size:
+                self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            loaded = load_tape(path, stat) if cache else None
+            if loaded is None:
+                self.tape = build_tape(self.data)
+                if cache:
+                    # the sidecar only saves time next time, so a read-only
+                    # directory or a full disk is no reason to fail
+                    try:
+                        save_tape(self.tape, path, stat)
+                    except OSError:
+                        pass
+            else:
+                self.tape, self._sidecar = loaded
+
+            if not len(self.tape) or self.tape.jumps[0] < 0:
+                raise ParseError("Invalid JSON provided.", 0)
+        except BaseException:
+            self.close()
+            raise
+
+    def children(self, opening: int) -> Iterator[tuple[int, int, int, int]]:
+        # yields (start, end, opening token or -1, colon token or -1) for
+        # every item of the container opened by the token `opening`
+        offsets, jumps = self.tape.offsets, self.tape.jumps
+        closing = jumps[opening]
+        start = offsets[opening] + 1
+        index = opening + 1
+
+        while index <= closing:
+            container = colon = -1
+            while True:
+                jump = jumps[index]
+                if jump > index:
+                    container = index
+                    index = jump + 1
+                elif jump == COLON:
+                    colon = index
+                    index += 1
+                else:
+                    break
+
+            end = offsets[index]
+            if container != -1 or colon != -1 or self.data[start:end].strip():
+                yield start, end, container, colon
+            start = end + 1
+            index += 1
+
+    def span(self, *path: str | int) -> tuple[int, int]:
+        offsets, jumps = self.tape.offsets, self.tape.jumps
+        opening = 0
+        start, end = offsets[0], offsets[jumps[0]] + 1
+
+        for key in path:
+            if opening == -1:
+                raise KeyError(key)
+
+            is_list = self.data[start : start + 1] == b"["
+            if isinstance(key, int) != is_list:
+                raise KeyError(key)
+
+            for position, (child_start, child_end, child, colon) in enumerate(
+                self.children(opening)
+            ):
+                if is_list and position == key:
+                    break
+                if not is_list and colon != -1:
+                    raw_key = self.data[child_start : offsets[colon]].strip()
+                    if raw_key[1:-1] == str(key).encode():
+                        child_start = offsets[colon] + 1
+                        break
+            else:
+                raise KeyError(key)
+
+            opening = child
+            if child == -1:
+                start, end = child_start, child_end
+            else:
+                start, end = offsets[child], offsets[jumps[child]] + 1
+
+        return start, end
+
+    def get(self, *path: str | int, **options: Any) -> Any:
+        start, end = self.span(*path)
+        text = bytes(self.data[start:end]).decode().strip()
+
+        if text[0] in "[{":
+            return ParseJson().parse(text, **options)
+        return ParseJson().parse("[" + text + "]", **options)[0]
+
+    def close(self) -> None:
+        # the tape views must go before the map they point into
+        if self._sidecar is not None:
+            self.tape = Tape(array("q"), array("q"))
+            self._sidecar.close()
+            self._sidecar = None
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def __enter__(self) -> "IndexedJson":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
@@ -0,0 +1,245 @@
+import pytest
+
+from combinators import (
+    Combinator,
+    ParseError,
+    bracketed,
+    choice,
+    compile_parser,
+    counted,
+    expect,
+    forward,
+    lift,
+    literal,
+    many,
+    memo,
+    nested,
+    optional,
+    regex,
+    result_from_tuple,
+    sep_by,
+    sequence,
+)
+from parse_json import ParseCurlyBrackets, document
+
+
+class TestPrimitives:
+    def test_literal(self):
+        parser = compile_parser(literal("ab"))
+
+        assert parser.parse("abc") == result_from_tuple(True, "ab", "c")
+        assert parser.parse("ba") == result_from_tuple(False)
+        assert parser("xab", 1) == ("ab", 3)
+
+    def test_regex(self):
+        parser = compile_parser(regex(r"(\d+)px", group=1))
+
+        assert parser.parse("12px;") == result_from_tuple(True, "12", ";")
+        assert parser.parse("px") == result_from_tuple(False)
+
+    def test_raises_when_called_without_match(self):
+        with pytest.raises(ParseError):
+            compile_parser(literal("a"))("b")
+
+
+class TestCombinators:
+    def test_sequence(self):
+        parser = compile_parser(sequence(literal("a"), regex(r"\d+"), literal("b")))
+
+        assert parser.parse("a12b!") == result_from_tuple(True, ("a", "12", "b"), "!")
+        assert parser.parse("a12c") == result_from_tuple(False)
+
+    def test_sequence_pick(self):
+        parser = compile_parser(
+            sequence(literal("("), regex(r"\w+"), literal(")"), pick=1)
+        )
+
+        assert parser.parse("(abc)") == result_from_tuple(True, "abc", "")
+
+    def test_choice_is_ordered(self):
+        parser = compile_parser(choice(literal("a"), literal("ab")))
+
+        assert parser.parse("ab") == result_from_tuple(True, "a", "b")
+
+    def test_many(self):
+        parser = compile_parser(many(literal("a")))
+
+        assert parser.parse("aaab") == result_from_tuple(True, ["a", "a", "a"], "b")
+        assert parser.parse("b") == result_from_tuple(True, [], "b")
+        assert compile_parser(many(literal("a"), 1)).parse("b") == result_from_tuple(
+            False
+        )
+
+    def test_sep_by(self):
+        parser = compile_parser(sep_by(regex(r"\d"), literal(",")))
+
+        assert parser.parse("1,2,3") == result_from_tuple(True, ["1", "2", "3"], "")
+        assert parser.parse("1,2,") == result_from_tuple(True, ["1", "2"], ",")
+
+    def test_optional(self):
+        parser = compile_parser(sequence(optional(literal("-"), ""), regex(r"\d")))
+
+        assert parser.parse("-1") == result_from_tuple(True, ("-", "1"), "")
+        assert parser.parse("1") == result_from_tuple(True, ("", "1"), "")
+
+    def test_map(self):
+        parser = compile_parser(regex(r"\d+").map(int).map(lambda number: number * 2))
+
+        assert parser.parse("21") == result_from_tuple(True, 42, "")
+
+    def test_expect(self):
+        parser = compile_parser(
+            sequence(literal("("), expect(literal(")"), "Unclosed"))
+        )
+
+        with pytest.raises(ParseError) as error:
+            parser.parse("(]")
+        assert error.value.pos == 1
+
+    def test_forward(self):
+        nested = forward()
+        nested.define(
+            choice(sequence(literal("("), nested, literal(")"), pick=1), literal("x"))
+        )
+
+        assert compile_parser(nested).parse("((x))") == result_from_tuple(True, "x", "")
+
+    def test_bracketed(self):
+        grammar = bracketed(
+            literal("("), regex(r"\d"), literal(","), literal(")"), "Unclosed"
+        ).map(tuple)
+
+        for parser in compile_parser(grammar), compile_parser(grammar, fuse=False):
+            assert parser.parse("(1,2)!") == result_from_tuple(True, ("1", "2"), "!")
+            assert parser.parse("()") == result_from_tuple(True, (), "")
+            assert parser.parse("1") == result_from_tuple(False)
+            with pytest.raises(ParseError) as error:
+                parser.parse("(1,)")
+            assert error.value.pos == 1
+
+    def test_map_errors_point_at_the_value(self):
+        def reject(value):
+            raise ParseError("Rejected")
+
+        parser = compile_parser(sequence(literal("ab"), regex(r"\d").map(reject)))
+
+        with pytest.raises(ParseError) as error:
+            parser.parse("ab1")
+        assert error.value.pos == 2
+
+    def test_combinator_needs_build(self):
+        with pytest.raises(TypeError):
+            Combinator()  # type: ignore[abstract]
+
+    def test_lift(self):
+        parser = compile_parser(sequence(literal("="), lift(ParseCurlyBrackets())))
+
+        assert parser.parse("={a}b") == result_from_tuple(True, ("=", "a"), "b")
+
+
+class TestLimits:
+    def test_sep_by_max_count(self):
+        parser = compile_parser(sep_by(regex(r"\d"), literal(","), max_count=2))
+
+        assert parser.parse("1,2") == result_from_tuple(True, ["1", "2"], "")
+        with pytest.raises(ParseError) as error:
+            parser.parse("1,2,3")
+        assert error.value.pos == 4
+
+    def test_nested(self):
+        parens = forward()
+        parens.define(
+            sequence(
+                literal("("),
+                nested(sequence(optional(parens), literal(")"), pick=0), 2),
+                pick=1,
+            )
+        )
+        parser = compile_parser(parens)
+
+        assert parser.parse("(())") == result_from_tuple(True, None, "")
+        assert parser.parse("()()") == result_from_tuple(True, None, "()")
+        with pytest.raises(ParseError):
+            parser.parse("((()))")
+
+    def test_counted(self):
+        parser = compile_parser(many(counted(regex(r"\w"), 3)))
+
+        assert parser.parse("abc") == result_from_tuple(True, ["a", "b", "c"], "")
+        with pytest.raises(ParseError):
+            parser.parse("abcd")
+
+
+class TestFusion:
+    def test_does_not_backtrack_into_fused_parts(self):
+        grammar = sequence(regex("a*"), literal("a"))
+
+        assert compile_parser(grammar, fuse=False).parse("aaa") == result_from_tuple(
+            False
+        )
+        assert compile_parser(grammar).parse("aaa") == result_from_tuple(False)
+
+    def test_fused_values_match_unfused(self):
+        grammar = sequence(
+            regex(r"\s*"),
+            choice(literal("true"), literal("false")),
+            regex(r"(\d)(\d)", group=2),
+            literal(";"),
+        )
+
+        for string in [" true12;", "false34;x", "nil12;", "true1;"]:
+            assert compile_parser(grammar).parse(string) == compile_parser(
+                grammar, fuse=False
+            ).parse(string)
+
+    def test_global_flags_are_not_fused(self):
+        grammar = sequence(literal("a"), regex("(?i)b"), literal(";"))
+        items = bracketed(
+            regex("(?i)x"), literal("a"), regex("(?x) ,"), literal("]"), "Unclosed"
+        )
+
+        for fuse in True, False:
+            assert compile_parser(grammar, fuse=fuse).parse("aB;") == (
+                result_from_tuple(True, ("a", "B", ";"), "")
+            )
+            assert compile_parser(items, fuse=fuse).parse("Xa,a]") == (
+                result_from_tuple(True, ["a", "a"], "")
+            )
+
+    def test_json_grammar_matches_unfused(self):
+        string = '{"a": [1, -2.5, "x"], "b": {"c": []}}'
+
+        assert compile_parser(document).parse(string) == compile_parser(
+            document, fuse=False
+        ).parse(string)
+
+
+class TestPackrat:
+    def test_memoized_results_are_reused(self):
+        calls = []
+
+        def count(value):
+            calls.append(value)
+            return value
+
+        shared = memo(regex(r"\w+").map(count))
+        grammar = choice(sequence(shared, literal("!")), sequence(shared, literal("?")))
+
+        assert compile_parser(grammar, memo_size=16).parse("hey?") == result_from_tuple(
+            True, ("hey", "?"), ""
+        )
+        assert calls == ["hey"]
+
+    def test_memo_table_is_bounded(self):
+        grammar = many(memo(literal("a")))
+        parser = compile_parser(grammar, memo_size=2)
+
+        assert parser.parse("aaaa") == result_from_tuple(True, ["a"] * 4, "")
+
+    def test_without_memo_size_memo_is_transparent(self):
+        calls = []
+        shared = memo(regex(r"\w+").map(calls.append))
+        grammar = choice(sequence(shared, literal("!")), sequence(shared, literal("?")))
+
+        compile_parser(grammar).parse("hey?")
+        assert calls == ["hey", "hey"]
@@ -0,0 +1,98 @@
+import json
+from collections import OrderedDict
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+import pytest
+
+from dump_json import JsonEncoder, dump, dumps
+from parse_json import ParseJson
+
+DOCUMENT = '{"a": [1, -2, 3.5, "x\\"y\\\\n", {}, []], "b": {"c": "d e"}}'
+
+
+class TestDumps:
+    def test_round_trips_parsed_values(self):
+        parser = ParseJson()
+        value = parser.parse(DOCUMENT)
+
+        assert dumps(value) == '{"a":[1,-2,3.5,"x\\"y\\\\n",{},[]],"b":{"c":"d e"}}'
+        assert parser.parse(dumps(value)) == value
+
+    def test_numbers(self):
+        parser = ParseJson()
+        numbers = [0, -0.0, 2**70, 0.1, 1e20, 1.5e-7, Decimal("1.50")]
+
+        assert dumps(numbers) == (
+            "[0,-0.0,1180591620717411303424,0.1,100000000000000000000.0,"
+            "0.00000015,1.50]"
+        )
+        assert parser.parse(dumps(parser.parse("[1.5]", lazy_numbers=True))) == [1.5]
+
+        for number in [float("nan"), float("inf"), Decimal("nan")]:
+            with pytest.raises(ValueError):
+                dumps([number])
+
+    def test_raw_strings_must_round_trip(self):
+        for string in ['a"b', "a\\"]:
+            with pytest.raises(ValueError):
+                dumps([string])
+
+    def test_escape(self):
+        value = {'k"': ['x"y\n\x01é\\', "plain"]}
+
+        assert dumps(value, escape=True) == '{"k\\"":["x\\"y\\n\\u0001é\\\\","plain"]}'
+        assert json.loads(dumps(value, escape=True)) == value
+
+    def test_other_containers(self):
+        value = OrderedDict(a=(1, 2))
+
+        assert dumps(value) == '{"a":[1,2]}'
+
+    def test_unsupported_values(self):
+        for value in [[True], [None], {1: 2}, iter([1])]:
+            with pytest.raises(TypeError):
+                dumps(value)
+
+    def test_stream_iterators(self):
+        value = {"rows": ({"n": n} for n in range(3))}
+
+        assert dumps(value, stream_iterators=True) == (
+            '{"rows":[{"n":0},{"n":1},{"n":2}]}'
+        )
+
+    def test_caches_keys(self):
+        encoder = JsonEncoder()
+        encoder.encode([{"a": 1, "b": 2}, {"a": 3}])
+
+        assert encoder.keys == {"a": ('"a":', ',"a":'), "b": ('"b":', ',"b":')}
+
+
+class TestDump:
+    def test_writes_in_chunks(self):
+        writes = []
+
+        class Sink:
+            def write(self, text):
+                writes.append(text)
+
+        def rows():
+            for n in range(100):
+                yield [n]
+            # earlier rows were written before the generator finished
+            assert writes
+
+        dump(rows(), Sink(), stream_iterators=True, buffer_size=10)
+
+        assert len(writes) > 10
+        assert json.loads("".join(writes)) == [[n] for n in range(100)]
+
+    def test_text_and_binary_sinks(self):
+        value = {"é": [1, 2.5]}
+        text, binary = StringIO(), BytesIO()
+
+        dump(value, text)
+        dump(value, binary)
+
+        assert text.getvalue() == '{"é":[1,2.5]}'
+        assert binary.getvalue() == '{"é":[1,2.5]}'.encode()
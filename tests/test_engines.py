@@ -0,0 +1,159 @@
+import random
+
+import pytest
+
+import parse_json
+from parse_json import Limits, ParseError, ParseJson, register_engine
+
+# fragments that the two engines read differently, or that only one accepts
+NOISE = list('{}[],: \n\x0b\xa0"\\0-x٣') + [
+    '"a"',
+    '"\\"',
+    "01",
+    "- 1",
+    "1.",
+    "1.2.3",
+    "e5",
+    "true",
+    "null",
+    "NaN",
+]
+SCALARS = ["1", "-2", "0.5", "-0", "01", "- 3", "1e3", "12345678901234567890"] + [
+    '"s"',
+    '""',
+    '"a b"',
+    '"x\ny"',
+    '"\\n"',
+    '"\\""',
+    "true",
+]
+
+
+def random_value(generator: random.Random, depth: int = 0) -> str:
+    kind = generator.random()
+    if depth > 4 or kind < 0.4:
+        return generator.choice(SCALARS)
+
+    count = generator.randint(0, 4)
+    if kind < 0.7:
+        items = (random_value(generator, depth + 1) for _ in range(count))
+        return "[" + ", ".join(items) + "]"
+    pairs = (
+        f'"{generator.choice("abcd")}": {random_value(generator, depth + 1)}'
+        for _ in range(count)
+    )
+    return "{" + ", ".join(pairs) + "}"
+
+
+def mutated(generator: random.Random, string: str) -> str:
+    characters = list(string)
+    for _ in range(generator.randint(0, 3)):
+        index = generator.randint(0, len(characters))
+        if characters and generator.random() < 0.4:
+            del characters[min(index, len(characters) - 1)]
+        else:
+            characters.insert(index, generator.choice(NOISE))
+    return "".join(characters)
+
+
+def deeply_nested(generator: random.Random, string: str) -> str:
+    # around the depth the pure parser stops at, which json goes well past
+    depth = generator.choice([150, 200, 201, 250, 300, 400])
+    openings = [generator.choice(["[", '{"a": ']) for _ in range(depth)]
+    closings = ["]" if opening == "[" else "}" for opening in reversed(openings)]
+    return "".join(openings) + string + "".join(closings)
+
+
+def fuzz_corpus(count: int, seed: int = 0) -> list[str]:
+    generator = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        string = random_value(generator)
+        if generator.random() < 0.05:
+            string = deeply_nested(generator, string)
+        if generator.random() < 0.5:
+            string = mutated(generator, string)
+        corpus.append(string)
+    return corpus
+
+
+def outcome(parser: ParseJson, string: str) -> str:
+    try:
+        return "ok " + repr(parser.parse(string))
+    except ParseError as error:
+        return f"error {error.pos}"
+
+
+class TestEngines:
+    def test_engines_agree_on_fuzz_corpus(self):
+        pure, stdlib = ParseJson("pure"), ParseJson("stdlib")
+
+        for string in fuzz_corpus(5000):
+            assert outcome(pure, string) == outcome(stdlib, string), string
+
+        assert stdlib.stats["stdlib"] > stdlib.stats["pure"] > 0
+
+    def test_auto_prefers_stdlib(self):
+        parser = ParseJson()
+
+        assert parser.parse('{"a": [1, 2.5, "b"]}') == {"a": [1, 2.5, "b"]}
+        assert parser.stats == {"stdlib": 1}
+
+    @pytest.mark.parametrize(
+        "string",
+        ['{"a": "\\n"}', "[- 1]", "[01]", "\xa0[1]", '{"a": true}'],
+    )
+    def test_falls_back_when_semantics_differ(self, string):
+        parser = ParseJson()
+
+        try:
+            parser.parse(string)
+        except ParseError:
+            pass
+        assert "stdlib" not in parser.stats
+
+    def test_falls_back_for_deep_documents(self):
+        parser = ParseJson()
+
+        assert parser.parse("[" * 200 + "]" * 200)
+        assert parser.parse("[" * 250 + "]" * 250)
+        assert parser.stats == {"stdlib": 1, "pure": 1}
+
+        with pytest.raises(ParseError):
+            parser.parse('{"a": ' * 300 + "1" + "}" * 300)
+
+    def test_falls_back_for_options(self):
+        parser = ParseJson()
+
+        assert parser.parse("[1.5]", lazy_numbers=True)[0] == 1.5
+        assert parser.parse("[1]", limits=Limits(max_depth=2)) == [1]
+        assert parser.parse("[[]]", list_hook=tuple) == ((),)
+        assert parser.stats == {"pure": 3}
+
+    def test_duplicate_keys_are_rejected(self):
+        with pytest.raises(ParseError):
+            ParseJson().parse('{"a": 1, "a": 2}')
+
+    def test_pure_engine(self):
+        parser = ParseJson("pure")
+
+        parser.parse("[1]")
+        assert parser.stats == {"pure": 1}
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            ParseJson("missing")
+
+    def test_register_engine(self, monkeypatch):
+        monkeypatch.setattr(parse_json, "engines", dict(parse_json.engines))
+        register_engine("empty", lambda string, start, options: ([], start + 2))
+
+        parser = ParseJson("empty")
+        assert parser.parse("[1]") == []
+        assert parser.stats == {"empty": 1}
+
+    def test_parse_many_stats(self):
+        parser = ParseJson()
+
+        parser.parse_many(["[1]", '["\\n"]', "{}"], batch_size=2)
+        assert parser.stats == {"stdlib": 2, "pure": 1}
@@ -0,0 +1,80 @@
+from io import StringIO
+
+import pytest
+
+from combinators import ParseError
+from formatting import minify, reformat
+from parse_json import ParseJson
+
+DOCUMENT = """ {"a": [1, - 2, 3.5, "x \\" y", {}, [ ]],
+  "b": {"c": "d e"}} """
+
+
+def minified(source, **options):
+    sink = StringIO()
+    minify(source, sink, **options)
+    return sink.getvalue()
+
+
+def reformatted(source, **options):
+    sink = StringIO()
+    reformat(source, sink, **options)
+    return sink.getvalue()
+
+
+class TestMinify:
+    def test_minifies(self):
+        expected = '{"a":[1,-2,3.5,"x \\" y",{},[]],"b":{"c":"d e"}}'
+
+        assert minified(DOCUMENT) == expected
+        for chunk_size in range(1, 8):
+            assert minified(StringIO(DOCUMENT), chunk_size=chunk_size) == expected
+
+    def test_keeps_documents_apart(self):
+        assert minified(StringIO("[1] {}\n[2]"), chunk_size=2) == "[1]{}[2]"
+
+    @pytest.mark.parametrize(
+        "string", ["[1 2]", "[1] 2", '"a"', "[1]]", "[1}", "[1", '["a]', "[x]"]
+    )
+    def test_rejects(self, string):
+        for chunk_size in (1, 100):
+            with pytest.raises(ParseError):
+                minified(StringIO(string), chunk_size=chunk_size)
+
+    def test_error_position(self):
+        with pytest.raises(ParseError) as error:
+            minified(StringIO('{"a": [1, "b"]]'), chunk_size=4)
+
+        assert error.value.pos == 14
+
+
+class TestReformat:
+    def test_reformats(self):
+        assert reformatted(StringIO(DOCUMENT), chunk_size=3) == (
+            "{\n"
+            '    "a": [\n'
+            "        1,\n"
+            "        -2,\n"
+            "        3.5,\n"
+            '        "x \\" y",\n'
+            "        {},\n"
+            "        []\n"
+            "    ],\n"
+            '    "b": {\n'
+            '        "c": "d e"\n'
+            "    }\n"
+            "}"
+        )
+
+    def test_indent(self):
+        assert (
+            reformatted("[[1], {}] [2]", indent="\t")
+            == "[\n\t[\n\t\t1\n\t],\n\t{}\n]\n[\n\t2\n]"
+        )
+
+    def test_round_trips(self):
+        parser = ParseJson()
+        value = parser.parse(DOCUMENT)
+
+        assert parser.parse(reformatted(DOCUMENT, indent=0)) == value
+        assert parser.parse(minified(reformatted(DOCUMENT))) == value
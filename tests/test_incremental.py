@@ -0,0 +1,82 @@
+import pytest
+
+from combinators import ParseError
+from incremental import parse_document
+from parse_json import ParseJson
+
+
+def span_of(string: str, old: str) -> tuple[int, int]:
+    start = string.index(old)
+    return start, start + len(old)
+
+
+class TestJsonDocument:
+    def test_parses_like_parse_json(self):
+        string = ' {"a": [1, {"b": "c"}], "d": {}}'
+
+        assert parse_document(string).value == ParseJson().parse(string)
+
+    def test_edits_nested_container(self):
+        document = parse_document('{"a": [1, {"b": "c"}], "d": [2]}')
+        start, end = span_of(document.text, '"c"')
+
+        document.apply_edit(start, end, "[3, 4]")
+
+        assert document.text == '{"a": [1, {"b": [3, 4]}], "d": [2]}'
+        assert document.value == {"a": [1, {"b": [3, 4]}], "d": [2]}
+
+    def test_keeps_later_spans_in_sync(self):
+        document = parse_document('[[1], [2], {"a": [3]}]')
+
+        start, end = span_of(document.text, "1")
+        document.apply_edit(start, end, "100, 101")
+        start, end = span_of(document.text, "3")
+        document.apply_edit(start, end, "4")
+        start, end = span_of(document.text, "2")
+        document.apply_edit(start, end, "")
+
+        assert document.text == '[[100, 101], [], {"a": [4]}]'
+        assert document.value == ParseJson().parse(document.text)
+
+    def test_many_edits_between_siblings(self):
+        document = parse_document("[" + ", ".join(f"[{n}]" for n in range(50)) + "]")
+
+        for n in range(0, 50, 7):
+            start, end = span_of(document.text, f"[{n}]")
+            document.apply_edit(start + 1, end - 1, str(n) * (n % 3))
+        for n in range(48, 0, -5):
+            if n % 7 == 0:
+                continue
+            start, end = span_of(document.text, f"[{n}]")
+            document.apply_edit(start + 1, end - 1, f"{n}, {n}")
+
+        assert document.value == ParseJson().parse(document.text)
+
+    def test_reparses_parent_when_structure_changes(self):
+        document = parse_document("[[1], [2]]")
+        start, end = span_of(document.text, "1")
+
+        document.apply_edit(start, end, "1], [5")
+
+        assert document.value == [[1], [5], [2]]
+
+    def test_edit_outside_root_reparses_document(self):
+        document = parse_document("[1]")
+
+        document.apply_edit(0, 3, '{"a": 1}')
+
+        assert document.value == {"a": 1}
+
+    def test_invalid_edit_leaves_document_unchanged(self):
+        document = parse_document('{"a": [1, 2]}')
+        start, end = span_of(document.text, "2")
+
+        with pytest.raises(ParseError):
+            document.apply_edit(start, end, "2,")
+
+        assert document.text == '{"a": [1, 2]}'
+        assert document.value == {"a": [1, 2]}
+
+    def test_edit_out_of_range(self):
+        with pytest.raises(ValueError):
+            parse_document("[]").apply_edit(1, 5, "")
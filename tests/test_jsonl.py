@@ -0,0 +1,65 @@
+from io import StringIO
+
+from jsonl import BadRecord, JsonLinesReader
+from parse_json import Limits, ParseJson
+
+LINES = '{"a": 1}\n\n{"a": [1, }\n[2]\n{"a": 1} x\n"str"\n  {"a": "x\n[3]'
+
+
+class TestJsonLinesReader:
+    def test_skips_bad_records(self):
+        reader = JsonLinesReader(StringIO(LINES))
+
+        assert list(reader) == [{"a": 1}, [2], [3]]
+        assert reader.report.good == 3
+        assert reader.report.bad == 4
+        assert reader.report.characters == len(LINES)
+        assert reader.report.errors == [
+            BadRecord(3, 7, "Failed to parse a list"),
+            BadRecord(5, 8, "Unexpected text after the record"),
+            BadRecord(6, 0, "Invalid JSON provided."),
+            BadRecord(7, 9, "Parsing error. Unclosed quote"),
+        ]
+
+    def test_reads_strings(self):
+        reader = JsonLinesReader('[1]\r\n{"b": 2}\n')
+
+        assert list(reader) == [[1], {"b": 2}]
+        assert reader.report.bad == 0
+
+    def test_options(self):
+        reader = JsonLinesReader(
+            '[1]\n[1, 2, 3]\n{"a": [2]}',
+            parser=ParseJson("pure"),
+            limits=Limits(max_container_items=2),
+            list_hook=tuple,
+        )
+
+        assert list(reader) == [(1,), {"a": (2,)}]
+        assert [error.line for error in reader.report.errors] == [2]
+        assert reader.parser.stats == {"pure": 2}
+
+    def test_hook_and_conversion_errors(self):
+        def hook(dictionary):
+            return dictionary["a"]
+
+        reader = JsonLinesReader(
+            '{"a": 1}\n{"b": 2}\n[%s]\n[1.5]\n{"a": [2]}' % ("9" * 5000),
+            object_hook=hook,
+            parse_float=lambda token: 1 / 0,
+        )
+
+        assert list(reader) == [1, [2]]
+        assert reader.report.errors == [
+            BadRecord(2, None, "KeyError: 'a'"),
+            BadRecord(3, 1, "Parsing error. Invalid number"),
+            BadRecord(4, None, "ZeroDivisionError: division by zero"),
+        ]
+
+    def test_throughput(self):
+        reader = JsonLinesReader("[1]\n" * 1000)
+
+        assert sum(1 for _ in reader) == 1000
+        assert reader.report.seconds > 0
+        assert reader.report.records_per_second > 0
+        assert reader.report.characters_per_second > 0
@@ -1,6 +1,16 @@
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+from io import StringIO
+from types import MappingProxyType
+
 import pytest
 
 from parse_json import (
+    LazyNumber,
+    Limits,
+    ParseError,
     ParseColon,
     ParseComma,
     ParseWhiteSpace,
@@ -210,6 +220,7 @@ class TestListParser:
         assert self.parser.parse("[ [],[],[],[[[]]] ]") == result_from_tuple(
             True, [[], [], [], [[[]]]], ""
         )
+        assert self.parser.parse("[ ]") == result_from_tuple(True, [], "")
         # TODO: add dictionary
 
     def test_throws_if_unclosed(self):
@@ -261,6 +272,7 @@ class TestDictionaryParser:
 
     def test_parses_correctly(self):
         assert self.parser.parse("{}") == result_from_tuple(True, {}, "")
+        assert self.parser.parse("{ }") == result_from_tuple(True, {}, "")
         assert self.parser.parse('{"a": 1}') == result_from_tuple(True, {"a": 1}, "")
         assert self.parser.parse('{"abc": "123", "bce": [123]}') == result_from_tuple(
             True, {"abc": "123", "bce": [123]}, ""
@@ -282,6 +294,9 @@ class TestDictionaryParser:
         with pytest.raises(Exception):
             self.parser.parse('{"abc":}')
 
+        with pytest.raises(Exception):
+            self.parser.parse('{"abc": 1, "abc": 2}')
+
 
 class TestJsonParser:
     parser = ParseJson()
@@ -621,3 +636,271 @@ class TestJsonParser:
         assert self.parser.parse('["[[["]') == ["[[["]
         assert self.parser.parse('["{{{"]') == ["{{{"]
         assert self.parser.parse(r'["\"{{{"]') == [r"\"{{{"]
+
+    def test_object_pairs_hook(self):
+        parsed = self.parser.parse(
+            '{"b": 1, "a": {"c": 2}}', object_pairs_hook=OrderedDict
+        )
+
+        assert parsed == OrderedDict([("b", 1), ("a", OrderedDict([("c", 2)]))])
+        assert isinstance(parsed["a"], OrderedDict)
+        assert self.parser.parse('{"a": 1, "a": 2}', object_pairs_hook=list) == [
+            ("a", 1),
+            ("a", 2),
+        ]
+
+    def test_object_hook(self):
+        parsed = self.parser.parse('[{"a": 1}]', object_hook=MappingProxyType)
+
+        assert isinstance(parsed[0], MappingProxyType)
+        assert parsed[0]["a"] == 1
+
+        with pytest.raises(Exception):
+            self.parser.parse('{"a": 1, "a": 2}', object_hook=MappingProxyType)
+
+    def test_list_hook(self):
+        assert self.parser.parse('[1, [2, {"a": [3]}]]', list_hook=tuple) == (
+            1,
+            (2, {"a": (3,)}),
+        )
+
+    def test_parse_float_and_parse_int(self):
+        assert self.parser.parse("[0.1, -2.50, 3]", parse_float=Decimal) == [
+            Decimal("0.1"),
+            Decimal("-2.50"),
+            3,
+        ]
+        assert self.parser.parse("[- 7, 1.5]", parse_int=str) == ["-7", 1.5]
+
+    def test_lazy_numbers(self):
+        converted = []
+
+        def parse_float(token):
+            converted.append(token)
+            return Decimal(token)
+
+        parsed = self.parser.parse(
+            '{"a": 1.25, "b": [-2, 3.5]}', parse_float=parse_float, lazy_numbers=True
+        )
+
+        assert isinstance(parsed["a"], LazyNumber)
+        assert converted == []
+        assert parsed["a"] == Decimal("1.25")
+        assert converted == ["1.25"]
+        assert parsed["b"][0] + 1 == -1
+        assert str(parsed["b"][1]) == "3.5"
+        assert parsed == {"a": Decimal("1.25"), "b": [-2, Decimal("3.5")]}
+
+        # numbers that are not plain are normalized and checked as before
+        assert self.parser.parse("[- 1, -0.5, 007]", lazy_numbers=True) == [-1, -0.5, 7]
+        for string in ["[1.2.3]", "[1.]", "[-]", "[1 2]"]:
+            with pytest.raises(ParseError):
+                self.parser.parse(string, lazy_numbers=True)
+
+        # as are integers too long for int(), unless another converter takes them
+        long = "9" * 5000
+        with pytest.raises(ParseError) as error:
+            self.parser.parse("[1, %s]" % long, lazy_numbers=True)
+        assert error.value.pos == 4
+        parsed = self.parser.parse("[%s]" % long, parse_int=Decimal, lazy_numbers=True)
+        assert parsed == [Decimal(long)]
+        assert self.parser.parse("[%s]" % ("9" * 700), lazy_numbers=True) == [
+            int("9" * 700)
+        ]
+
+    def test_raw_decode(self):
+        assert self.parser.raw_decode('{"a": 1}{"b": 2}') == ({"a": 1}, 8)
+        assert self.parser.raw_decode('{"a": 1} [2]', 8) == ([2], 12)
+        assert self.parser.raw_decode("[1.5]", parse_float=Decimal) == (
+            [Decimal("1.5")],
+            5,
+        )
+
+        with pytest.raises(Exception):
+            self.parser.raw_decode("[1] x", 3)
+
+    def test_iter_documents(self):
+        frames = '{"a": 1}{"b": [2, 3]}\n[4] \n'
+
+        assert list(self.parser.iter_documents(frames)) == [
+            {"a": 1},
+            {"b": [2, 3]},
+            [4],
+        ]
+        assert list(self.parser.iter_documents(StringIO(frames), chunk_size=3)) == [
+            {"a": 1},
+            {"b": [2, 3]},
+            [4],
+        ]
+        assert list(self.parser.iter_documents(StringIO(""))) == []
+
+        with pytest.raises(Exception):
+            list(self.parser.iter_documents(StringIO('[1]{"a": '), chunk_size=4))
+
+    def test_iter_documents_stops_at_a_bad_frame(self):
+        # strings and numbers cut off by a chunk are read on
+        frames = '["a b c", 1.25, "d\\"e"] {"f": -  2.5}'
+        for chunk_size in range(1, 8):
+            assert list(
+                self.parser.iter_documents(StringIO(frames), chunk_size=chunk_size)
+            ) == [["a b c", 1.25, 'd\\"e'], {"f": -2.5}]
+
+        # a frame that cannot be completed fails without reading the rest
+        source = StringIO("[2] [1} " + "[2]" * 100000)
+        documents = self.parser.iter_documents(source, chunk_size=16)
+        assert next(documents) == [2]
+        with pytest.raises(ParseError) as error:
+            next(documents)
+        assert error.value.pos == 5
+        assert source.tell() < 100
+
+    def test_parse_columns(self):
+        records = '[{"a": 1, "b": "x", "c": [1, 2]}, {"b": "y", "a": 2}, {"a": 3}]'
+
+        assert self.parser.parse_columns(records, ["a", "b"]) == {
+            "a": [1, 2, 3],
+            "b": ["x", "y", None],
+        }
+        columns = self.parser.parse_columns(
+            StringIO(records), ["a"], types={"a": "q"}, chunk_size=3
+        )
+        assert columns == {"a": array("q", [1, 2, 3])}
+        assert self.parser.parse_columns(" [ ] ", ["a"]) == {"a": []}
+
+        for string in ['[{"a": 1}', '[{"a": 1, "a": 2}]', '{"a": 1}', "[1]", "[{}, ]"]:
+            with pytest.raises(ParseError):
+                self.parser.parse_columns(StringIO(string), ["a"], chunk_size=2)
+
+        with pytest.raises(ParseError, match="Missing field"):
+            self.parser.parse_columns('[{"b": 1}]', ["a"], types={"a": "q"})
+
+        with pytest.raises(ParseError, match="Invalid value"):
+            self.parser.parse_columns('[{"a": 1.5}]', ["a"], types={"a": "q"})
+
+    @pytest.mark.parametrize("engine", ["auto", "pure"])
+    def test_parse_columns_skips_other_values(self, engine):
+        parser = ParseJson(engine)
+        deep = "[" * 150 + "]" * 150
+        records = [
+            '{"a": 1, "b": {"c": [1, {"d": "x"}], "e": - 2}}',
+            '{ "b" : [ ] , "a" : "y\\"z" }',
+            '{"b": %s, "a": [1, {"c": 2}]}' % deep,
+            '{"b": "\\n", "a": 1.5}',
+        ]
+        source = "[%s]" % ", ".join(records)
+
+        assert parser.parse_columns(source, ["a", "a"]) == {
+            "a": [1, 'y\\"z', [1, {"c": 2}], 1.5]
+        }
+        for chunk_size in (1, 7):
+            assert parser.parse_columns(
+                StringIO(source), ["a"], chunk_size=chunk_size
+            ) == {"a": [1, 'y\\"z', [1, {"c": 2}], 1.5]}
+
+        # a broken record fails without reading the rest
+        for broken in ['{"a": 1}}', '{"a": 1] ', "2"]:
+            source = StringIO("[%s, %s" % (broken, '{"a": 1}, ' * 10000))
+            with pytest.raises(ParseError):
+                parser.parse_columns(source, ["a"], chunk_size=16)
+            assert source.tell() < 100
+
+        # skipped values are checked like the rest of the record
+        for value in ['{"c": 1, "c": 2}', "[1, ]", "1.2.3", "9" * 5000, "[1}"]:
+            with pytest.raises(ParseError):
+                parser.parse_columns('[{"a": 1, "b": %s}]' % value, ["a"])
+
+    def test_parse_many(self):
+        strings = ['{"id": %d}' % i for i in range(50)]
+        expected = [{"id": i} for i in range(50)]
+
+        assert self.parser.parse_many(strings, batch_size=7) == expected
+        assert self.parser.parse_many([]) == []
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert (
+                self.parser.parse_many(iter(strings), executor=executor, batch_size=3)
+                == expected
+            )
+            assert self.parser.parse_many(
+                ["[1.5]"], executor=executor, parse_float=Decimal
+            ) == [[Decimal("1.5")]]
+
+            with pytest.raises(Exception):
+                self.parser.parse_many(["[1]", "[", "[2]"], executor=executor)
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            assert (
+                self.parser.parse_many(strings, executor=executor, batch_size=10)
+                == expected
+            )
+
+    def test_limits(self):
+        string = '{"a": [1, [2, "xyz"]], "b": {}}'
+
+        assert self.parser.parse(
+            string,
+            limits=Limits(
+                max_depth=3,
+                max_document_length=len(string),
+                max_string_length=3,
+                max_container_items=2,
+                max_values=6,
+            ),
+        ) == {"a": [1, [2, "xyz"]], "b": {}}
+
+        for limits in [
+            Limits(max_depth=2),
+            Limits(max_document_length=len(string) - 1),
+            Limits(max_string_length=2),
+            Limits(max_container_items=1),
+            Limits(max_values=5),
+        ]:
+            with pytest.raises(ParseError):
+                self.parser.parse(string, limits=limits)
+
+    def test_limits_stop_early(self):
+        with pytest.raises(ParseError) as error:
+            self.parser.parse("[" + "1, " * 1000 + "[", limits=Limits(max_values=10))
+        assert error.value.pos < 40
+
+    def test_long_document_stops_early(self):
+        built = []
+        limits = Limits(max_document_length=100)
+        string = "[1] [" + "[1], " * 10000 + "[1]]"
+
+        with pytest.raises(ParseError) as error:
+            list(
+                self.parser.iter_documents(
+                    string, limits=limits, list_hook=built.append
+                )
+            )
+        assert error.value.pos == 104
+        assert len(built) < 30
+
+    def test_long_string_position(self):
+        with pytest.raises(ParseError) as error:
+            self.parser.parse('["abc", "toolong"]', limits=Limits(max_string_length=3))
+        assert error.value.pos == 8
+        assert str(error.value.__cause__) == "String is too long"
+
+    def test_deep_nesting_is_a_parse_error(self):
+        with pytest.raises(ParseError):
+            self.parser.parse("[" * 10000 + "]" * 10000)
+
+    def test_nesting_depth(self):
+        # each level of nesting costs a few frames of the pure parser
+        parser = ParseJson("pure")
+        lists = "[" * 240 + "]" * 240
+        dictionaries = '{"a": ' * 140 + "1" + "}" * 140
+        mixed = '[{"a": ' * 90 + "1" + "}]" * 90
+
+        assert parser.parse(lists)
+        assert parser.parse(dictionaries)
+        assert parser.parse(mixed)
+
+    def test_number_too_long_for_int(self):
+        with pytest.raises(ParseError) as error:
+            ParseJson("pure").parse("[1, " + "9" * 5000 + "]")
+        assert error.value.pos == 4
+        with pytest.raises(ParseError):
+            ParseJson("pure").parse("[" + "9" * 5000 + "]", parse_float=Decimal)
@@ -0,0 +1,128 @@
+import io
+import os
+import tempfile
+
+import pytest
+
+from parse_json import ParseJson
+from snapshot import dump_snapshot, load_snapshot, parse_file, snapshot_path
+
+DOCUMENT = """{
+    "title": "ünïcode",
+    "list": [1, -2, 3.25, "two", [], {}, 123456789012345678901234567890],
+    "nested": [{"a": "x", "b": 1}, {"a": "y", "b": 2}]
+}"""
+
+
+def round_trip(value):
+    file = io.BytesIO()
+    dump_snapshot(value, file)
+    file.seek(0)
+    return load_snapshot(file)
+
+
+class TestSnapshot:
+    def test_round_trip(self):
+        value = ParseJson().parse(DOCUMENT)
+
+        assert round_trip(value) == value
+        assert round_trip([]) == []
+        assert round_trip({"": ""}) == {"": ""}
+
+    def test_keeps_key_order(self):
+        value = {"b": 1, "a": {"d": 2, "c": 3}}
+
+        assert list(round_trip(value)) == ["b", "a"]
+        assert list(round_trip(value)["a"]) == ["d", "c"]
+
+    def test_strings_with_separator(self):
+        value = {"a\0": ["", "b\0c", 2**70], "": []}
+
+        assert round_trip(value) == value
+        assert round_trip("x") == "x"
+
+    def test_shares_shapes(self):
+        file = io.BytesIO()
+        dump_snapshot([{"a": i, "b": [i]} for i in range(1000)], file)
+
+        # a byte per container and two per number, against 17 characters
+        # of JSON per record
+        assert len(file.getvalue()) < 8000
+
+    def test_interns_keys(self):
+        file = io.BytesIO()
+        dump_snapshot([{"repeated": i} for i in range(100)], file)
+
+        assert file.getvalue().count(b"repeated") == 1
+
+    def test_unsupported_values(self):
+        with pytest.raises(TypeError):
+            dump_snapshot([True], io.BytesIO())
+
+        with pytest.raises(TypeError):
+            dump_snapshot({1: "a"}, io.BytesIO())
+
+    def test_not_a_snapshot(self):
+        with pytest.raises(ValueError):
+            load_snapshot(io.BytesIO(b"[1, 2]"))
+
+
+class TestParseFile:
+    @pytest.fixture
+    def document_path(self, tmp_path):
+        path = tmp_path / "document.json"
+        path.write_text(DOCUMENT, encoding="utf-8")
+        return str(path)
+
+    def test_writes_and_reuses_snapshot(self, document_path, monkeypatch):
+        expected = ParseJson().parse(DOCUMENT)
+
+        assert parse_file(document_path) == expected
+        assert os.path.exists(snapshot_path(document_path))
+
+        monkeypatch.setattr(ParseJson, "parse", None)
+        assert parse_file(document_path) == expected
+
+    def test_snapshot_is_invalidated_by_changes(self, document_path):
+        parse_file(document_path)
+
+        with open(document_path, "w") as source:
+            source.write('{"changed": [1]}')
+
+        assert parse_file(document_path) == {"changed": [1]}
+
+    def test_without_cache(self, document_path):
+        assert parse_file(document_path, cache=False) == ParseJson().parse(DOCUMENT)
+        assert not os.path.exists(snapshot_path(document_path))
+
+    @pytest.mark.parametrize("size", [0, 80, 120, -3])
+    def test_broken_snapshot_is_rebuilt(self, document_path, size):
+        expected = ParseJson().parse(DOCUMENT)
+        parse_file(document_path)
+
+        with open(snapshot_path(document_path), "r+b") as file:
+            data = file.read()
+            file.seek(0)
+            file.truncate()
+            # cut off, or the same length with the end overwritten
+            file.write(data[:size] if size >= 0 else data[:size] + b"\xff" * 3)
+
+        assert parse_file(document_path) == expected
+        assert parse_file(document_path) == expected
+
+    def test_leaves_no_temporary_files(self, document_path, tmp_path):
+        parse_file(document_path)
+
+        assert sorted(os.listdir(tmp_path)) == [
+            "document.json",
+            "document.json.snapshot",
+        ]
+
+    def test_failing_to_save_the_snapshot(self, document_path, monkeypatch):
+        def mkstemp(**_):
+            raise PermissionError("read-only directory")
+
+        monkeypatch.setattr(tempfile, "mkstemp", mkstemp)
+
+        assert parse_file(document_path) == ParseJson().parse(DOCUMENT)
+        assert not os.path.exists(snapshot_path(document_path))
@@ -0,0 +1,116 @@
+import os
+import tempfile
+
+import pytest
+
+from combinators import ParseError
+from tape import COLON, COMMA, HEADER, IndexedJson, build_tape, sidecar_path
+
+DOCUMENT = """{
+    "title": "example",
+    "list": [1, "two", [3, {"four": 4}], {}],
+    "nested": {"a": {"b": ["[{", "}]"]}}
+}"""
+
+
+@pytest.fixture
+def document_path(tmp_path):
+    path = tmp_path / "document.json"
+    path.write_text(DOCUMENT)
+    return str(path)
+
+
+class TestBuildTape:
+    def test_matches_brackets(self):
+        tape = build_tape(b'[1, {"a": [2]}, "]"]')
+
+        assert list(tape.offsets) == [0, 2, 4, 8, 10, 12, 13, 14, 19]
+        assert list(tape.jumps) == [8, COMMA, 6, COLON, 5, 4, 2, COMMA, 0]
+
+    def test_throws_if_unbalanced(self):
+        with pytest.raises(ParseError):
+            build_tape(b"[[]")
+
+        with pytest.raises(ParseError):
+            build_tape(b"[]]")
+
+        with pytest.raises(ParseError):
+            build_tape(b"[}")
+
+        with pytest.raises(ParseError):
+            build_tape(b'["a]')
+
+
+class TestIndexedJson:
+    def test_gets_subtrees(self, document_path):
+        with IndexedJson(document_path) as indexed:
+            assert indexed.get() == {
+                "title": "example",
+                "list": [1, "two", [3, {"four": 4}], {}],
+                "nested": {"a": {"b": ["[{", "}]"]}},
+            }
+            assert indexed.get("title") == "example"
+            assert indexed.get("list", 1) == "two"
+            assert indexed.get("list", 2, 1, "four") == 4
+            assert indexed.get("list", 3) == {}
+            assert indexed.get("nested", "a", "b", 1) == "}]"
+
+    @pytest.mark.parametrize("text", ["[1, {]", '["a', ", 1", ""])
+    def test_closes_invalid_files(self, tmp_path, monkeypatch, text):
+        path = tmp_path / "invalid.json"
+        path.write_text(text)
+        closed = []
+        close = IndexedJson.close
+        monkeypatch.setattr(
+            IndexedJson, "close", lambda self: closed.append(close(self))
+        )
+
+        with pytest.raises(ParseError):
+            IndexedJson(str(path))
+        assert closed == [None]
+
+    def test_missing_path(self, document_path):
+        with IndexedJson(document_path) as indexed:
+            for path in [("missing",), ("list", 4), ("title", 0), (0,)]:
+                with pytest.raises(KeyError):
+                    indexed.get(*path)
+
+    def test_reuses_sidecar(self, document_path):
+        IndexedJson(document_path).close()
+        assert os.path.exists(sidecar_path(document_path))
+
+        with IndexedJson(document_path) as indexed:
+            assert indexed._sidecar is not None
+            assert indexed.get("list", 0) == 1
+
+    def test_sidecar_is_invalidated_by_changes(self, document_path):
+        IndexedJson(document_path).close()
+
+        with open(document_path, "w") as source:
+            source.write('{"changed": [1]}')
+
+        with IndexedJson(document_path) as indexed:
+            assert indexed._sidecar is None
+            assert indexed.get("changed", 0) == 1
+
+    def test_without_cache(self, document_path):
+        with IndexedJson(document_path, cache=False) as indexed:
+            assert indexed.get("title") == "example"
+        assert not os.path.exists(sidecar_path(document_path))
+
+    def test_sidecar_size(self, document_path):
+        with IndexedJson(document_path) as indexed:
+            count = len(indexed.tape)
+
+        # 32-bit offsets and jumps
+        assert os.path.getsize(sidecar_path(document_path)) == HEADER.size + 8 * count
+
+    def test_failing_to_save_the_sidecar(self, document_path, monkeypatch):
+        def mkstemp(**_):
+            raise PermissionError("read-only directory")
+
+        monkeypatch.setattr(tempfile, "mkstemp", mkstemp)
+
+        with IndexedJson(document_path) as indexed:
+            assert indexed.get("title") == "example"
+        assert not os.path.exists(sidecar_path(document_path))